@@ -60,6 +60,8 @@ class Settings(BaseSettings):
     # maximum number of records per request: 2000 (CREODIAS currently does not allow
     # more)
     CREODIAS_MAX_RECORDS: int = 2000
+    # number of datasets downloaded from CREODIAS in parallel
+    CREODIAS_MAX_DOWNLOAD_WORKERS: int = 8
 
     # define Planet-API token
     PLANET_API_KEY: str = ""
@@ -81,6 +83,12 @@ class Settings(BaseSettings):
     USE_STAC: bool = True
     MAX_ITEMS: int = 500
     LIMIT_ITEMS: int = 5
+    # number of sub-periods a STAC query is split into and searched in parallel.
+    # Each sub-period may return up to MAX_ITEMS items (the query stops once
+    # MAX_ITEMS items were received in total)
+    STAC_N_SPLITS: int = 1
+    # number of STAC queries sent concurrently by `query_stac_batch`
+    STAC_BATCH_WORKERS: int = 4
 
     # change the value of this variable to use a different STAC service provider
     STAC_BACKEND: Any = STAC_Providers.MSPC  # STAC_Providers.AWS
@@ -95,6 +103,19 @@ class Settings(BaseSettings):
     # maximum number of HTTPS retries
     NUMBER_HTTPS_RETRIES: int = 5
 
+    # opt-in: STAC query responses are cached in STAC_CACHE_DIR and re-used
+    # for identical queries for the number of seconds specified. Items added
+    # to (or updated in) the catalog within that time are not returned.
+    # 0 (default) disables caching
+    STAC_CACHE_DIR: Path = Path.home().joinpath(".cache", "eodal", "stac")
+    STAC_CACHE_TTL: int = 0
+    # seconds after which the STAC root catalog is fetched again (0 = never)
+    STAC_ROOT_TTL: int = 3600
+    # opt-in: cache the HTTP responses of the STAC server (requires
+    # requests-cache) in STAC_CACHE_DIR for STAC_CACHE_TTL seconds or as
+    # allowed by the server (requires STAC_CACHE_TTL > 0 as well)
+    STAC_HTTP_CACHE: bool = False
+
     # define logger
     CURRENT_TIME: str = datetime.now().strftime("%Y%m%d-%H%M%S")
     LOGGER_NAME: str = "eodal"
@@ -106,6 +127,14 @@ class Settings(BaseSettings):
     # temporary working directory
     TEMP_WORKING_DIR: Path = Path(tempfile.gettempdir())
 
+    # cache the parsed Sentinel-2 metadata xmls on disk when looping over an
+    # archive (speeds up re-ingestion of unchanged scenes). The cache is kept
+    # per user in S2_MTD_CACHE_DIR, entries not used for S2_MTD_CACHE_MAX_AGE
+    # days are removed
+    S2_MTD_CACHE: bool = False
+    S2_MTD_CACHE_DIR: Path = Path.home().joinpath(".cache", "eodal", "s2_mtd")
+    S2_MTD_CACHE_MAX_AGE: int = 30
+
     # logger
     logger: logging.Logger = logging.getLogger(LOGGER_NAME)
 
@@ -129,7 +158,7 @@ class Settings(BaseSettings):
         self.logger.addHandler(ch)
 
 
-@lru_cache()
+@lru_cache(maxsize=1)
 def get_settings():
     """
     loads package settings using ``last-recently-used`` cache
@@ -26,10 +26,8 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 from __future__ import annotations
 
-import cv2
 import geopandas as gpd
 import matplotlib as mpl
-import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 import numpy as np
 import rasterio as rio
@@ -41,7 +39,7 @@ import zarr
 from copy import deepcopy
 from matplotlib.axes import Axes
 from matplotlib.colors import ListedColormap
-from matplotlib.figure import figaspect
+from matplotlib.figure import Figure, figaspect
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 from numbers import Number
 from pathlib import Path
@@ -60,6 +58,7 @@ from eodal.core.operators import Operator
 from eodal.core.utils.geometry import check_geometry_types, convert_3D_2D
 from eodal.core.utils.raster import get_raster_attributes, bounds_window
 from eodal.utils.arrays import count_valid, upsample_array, array_from_points
+from eodal.utils.constants import INTER_NEAREST_EXACT
 from eodal.utils.exceptions import (
     BandNotFoundError,
     DataExtractionError,
@@ -1486,7 +1485,7 @@ class Band(object):
         xlabel: Optional[str] = None,
         fontsize: Optional[int] = 12,
         **kwargs,
-    ) -> plt.Figure:
+    ) -> Figure:
         """
         Plots the raster histogram using ``matplotlib``
 
@@ -1504,6 +1503,7 @@ class Band(object):
         """
         # open figure and axes for plotting
         if ax is None:
+            import matplotlib.pyplot as plt
             fig, ax = plt.subplots(nrows=1, ncols=1, num=1, clear=True)
         # or get figure from existing axis object passed
         else:
@@ -1530,7 +1530,7 @@ class Band(object):
         vmax: Optional[Union[int, float]] = None,
         fontsize: Optional[int] = 12,
         ax: Optional[Axes] = None,
-    ) -> plt.Figure:
+    ) -> Figure:
         """
         Plots the raster values using ``matplotlib``
 
@@ -1588,6 +1588,7 @@ class Band(object):
 
         # open figure and axes for plotting
         if ax is None:
+            import matplotlib.pyplot as plt
             fig, ax = plt.subplots(
                 nrows=1, ncols=1, figsize=w_h_ratio, num=1, clear=True
             )
@@ -1771,7 +1772,7 @@ class Band(object):
     def resample(
         self,
         target_resolution: Union[int, float],
-        interpolation_method: Optional[int] = cv2.INTER_NEAREST_EXACT,
+        interpolation_method: Optional[int] = INTER_NEAREST_EXACT,
         target_shape: Optional[Tuple[int, int]] = None,
         inplace: Optional[bool] = False,
     ):
@@ -1834,7 +1835,9 @@ class Band(object):
             )
             target_shape = (nrows_resampled, ncols_resampled)
 
-        # opencv2 switches the axes order!
+        # opencv2 is imported on demand as it is only required for resampling.
+        # It switches the axes order!
+        import cv2
         dim_resampled = (ncols_resampled, nrows_resampled)
 
         # check if the band data is stored in a masked array
@@ -1914,7 +1917,7 @@ class Band(object):
         if self.is_masked_array:
             # convert bools to int8 (cv2 does not support boolean arrays)
             in_mask = deepcopy(self.values.mask).astype("uint8")
-            out_mask = cv2.resize(in_mask, dim_resampled, cv2.INTER_NEAREST_EXACT)
+            out_mask = cv2.resize(in_mask, dim_resampled, INTER_NEAREST_EXACT)
             # convert mask back to boolean array
             out_mask = out_mask.astype(bool)
             # re-use fill value of the original array
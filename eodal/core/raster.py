@@ -71,7 +71,6 @@ from __future__ import annotations
 
 import datetime
 import geopandas as gpd
-import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 import numpy as np
 import pandas as pd
@@ -86,7 +85,7 @@ from functools import reduce
 from itertools import chain
 from matplotlib import colors
 from matplotlib.axes import Axes
-from matplotlib.pyplot import Figure
+from matplotlib.figure import Figure
 from numbers import Number
 from pathlib import Path
 from rasterio.drivers import driver_from_extension
@@ -1165,6 +1164,7 @@ class RasterCollection(MutableMapping):
 
         # get new axis and figure or figure from existing axis
         if ax is None:
+            import matplotlib.pyplot as plt
             fig = plt.figure(**kwargs)
             ax = fig.add_subplot(111)
         else:
@@ -23,13 +23,13 @@ from __future__ import annotations
 import datetime
 import dateutil.parser
 import geopandas as gpd
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import pickle
 import xarray as xr
 
 from collections.abc import MutableMapping
+from matplotlib.figure import Figure
 from copy import deepcopy
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Tuple
@@ -84,20 +84,22 @@ class SceneCollection(MutableMapping):
 
     def __getitem__(self, key: str | slice) -> RasterCollection:
         def _get_scene_from_key(key: str | Any) -> RasterCollection:
-            if self.indexed_by_timestamps:
-                if str(key) in self.timestamps:
-                    # most likely time stamps are passed as strings
-                    # ^^ not true for scene collection loaded from pickle file
-                    # we infer the format using dateutil
-                    if isinstance(key, str):
-                        key = dateutil.parser.parse(key)
-                    return self.collection[key]
-            else:
-                if key in self.timestamps:
+            # keys of the collection are looked up directly
+            try:
+                if key in self.collection:
                     return self.collection[key]
+            except TypeError:
+                pass
+            # most likely time stamps are passed as strings
+            # ^^ not true for scene collection loaded from pickle file
+            # the scene is taken by its position in the collection
+            if self.indexed_by_timestamps:
+                timestamps = self.timestamps
+                if str(key) in timestamps:
+                    return list(self.collection.values())[timestamps.index(str(key))]
             if key in self.identifiers:
                 scene_idx = self.identifiers.index(key)
-                return self.__getitem__(self.timestamps[scene_idx])
+                return list(self.collection.values())[scene_idx]
 
         # has a single key or slice been passed?
         if not isinstance(key, slice):
@@ -156,11 +158,9 @@ class SceneCollection(MutableMapping):
             if set([slice_start, slice_end]).issubset(set(self.timestamps)):
                 idx_start = self.timestamps.index(slice_start)
                 idx_end = self.timestamps.index(slice_end) + end_increment
-                scenes = self.timestamps
             elif set([slice_start, slice_end]).issubset(set(self.identifiers)):
                 idx_start = self.identifiers.index(slice_start)
                 idx_end = self.identifiers.index(slice_end) + end_increment
-                scenes = self.identifiers
             # allow selection by date range
             elif isinstance(slice_start, datetime.date) and isinstance(
                 slice_end, datetime.date
@@ -186,8 +186,9 @@ class SceneCollection(MutableMapping):
                 slice_step = 1
             # get an empty SceneCollection for returning the slide
             out_scoll = SceneCollection()
+            scenes_in_collection = list(self.collection.values())
             for idx in range(idx_start, idx_end, slice_step):
-                out_scoll.add_scene(_get_scene_from_key(key=scenes[idx]))
+                out_scoll.add_scene(scenes_in_collection[idx])
             return out_scoll
 
     def __getstate__(self):
@@ -544,7 +545,7 @@ class SceneCollection(MutableMapping):
         max_scenes_in_row: Optional[int] = 6,
         eodal_plot_kwargs: Optional[Dict] = {},
         **kwargs,
-    ) -> plt.Figure:
+    ) -> Figure:
         """
         Plots scenes in a `SceneCollection`
 
@@ -570,6 +571,9 @@ class SceneCollection(MutableMapping):
         if len(band_selection) == 1:
             plot_multiple_bands = False
 
+        # pyplot is imported on demand as it is only required for plotting
+        import matplotlib.pyplot as plt
+
         # check number of mapper in feature_scenes and determine figure size
         n_scenes = len(self)
         nrows = 1
@@ -25,7 +25,6 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import annotations
 
-import cv2
 import io
 import json
 import numpy as np
@@ -44,7 +43,7 @@ from eodal.config import get_settings, STAC_Providers
 from eodal.core.band import Band
 from eodal.core.raster import RasterCollection, SceneProperties
 from eodal.utils.geometry import adopt_vector_features_to_mask
-from eodal.utils.constants import ProcessingLevels
+from eodal.utils.constants import INTER_NEAREST_EXACT, ProcessingLevels
 from eodal.utils.constants.landsat import (
     band_resolution,
     landsat_band_mapping,
@@ -494,10 +493,11 @@ class Landsat(RasterCollection):
                     continue
                 # otherwise resample the mask of the lowest resolution to the
                 # current resolution using nearest neighbor interpolation
+                import cv2
                 tmp = shape_mask.astype("uint8")
                 dim_resampled = (landsat[band_name].ncols, landsat[band_name].nrows)
                 res = cv2.resize(
-                    tmp, dim_resampled, interpolation=cv2.INTER_NEAREST_EXACT
+                    tmp, dim_resampled, interpolation=INTER_NEAREST_EXACT
                 )
                 # cast back to boolean
                 mask = res.astype("bool")
@@ -25,14 +25,13 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import annotations
 
-import cv2
 import numpy as np
 import pandas as pd
 import geopandas as gpd
 import rasterio as rio
 
 from copy import deepcopy
-from matplotlib.pyplot import Figure
+from matplotlib.figure import Figure
 from matplotlib import colors
 from numbers import Number
 from pathlib import Path
@@ -41,6 +40,7 @@ from typing import Any, Dict, Optional, List, Tuple, Union
 
 from eodal.core.band import Band, WavelengthInfo
 from eodal.core.raster import RasterCollection, SceneProperties
+from eodal.utils.constants import INTER_NEAREST_EXACT
 from eodal.utils.constants.sentinel2 import (
     band_resolution,
     band_widths,
@@ -401,10 +401,11 @@ class Sentinel2(RasterCollection):
             if masking_after_read_required:
                 # otherwise resample the mask of the lowest resolution to the
                 # current resolution using nearest neighbor interpolation
+                import cv2
                 tmp = shape_mask.astype("uint8")
                 dim_resampled = (sentinel2[band_name].ncols, sentinel2[band_name].nrows)
                 res = cv2.resize(
-                    tmp, dim_resampled, interpolation=cv2.INTER_NEAREST_EXACT
+                    tmp, dim_resampled, interpolation=INTER_NEAREST_EXACT
                 )
                 # cast back to boolean
                 mask = res.astype("bool")
@@ -37,6 +37,7 @@ from shapely.geometry import Polygon
 from typing import Optional
 
 from eodal.config import get_settings
+from eodal.utils.exceptions import DataNotFoundError
 
 Settings = get_settings()
 logger = Settings.logger
@@ -116,11 +117,11 @@ def query_creodias(
 
     # make sure datasets is not empty otherwise return
     if datasets.empty:
-        raise Exception("CREODIAS query returned empty set")
+        raise DataNotFoundError("CREODIAS query returned empty set")
 
     # get *.SAFE dataset names
-    datasets["dataset_name"] = datasets.properties.apply(
-        lambda x: x["productIdentifier"].split("/")[-1]
-    )
+    datasets["dataset_name"] = [
+        x["productIdentifier"].rsplit("/", 1)[-1] for x in datasets.properties
+    ]
 
     return datasets
@@ -121,8 +121,8 @@ def query_creodias(
         raise DataNotFoundError("CREODIAS query returned empty set")
 
     # get *.SAFE dataset names
-    datasets["dataset_name"] = datasets.properties.apply(
-        lambda x: x["productIdentifier"].split("/")[-1]
-    )
+    datasets["dataset_name"] = [
+        x["productIdentifier"].rsplit("/", 1)[-1] for x in datasets.properties
+    ]
 
     return datasets
@@ -18,22 +18,31 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 from __future__ import annotations
 
-import os
 import pandas as pd
 import pyotp
 import requests
-import shutil
+import threading
 import time
 
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 from pathlib import Path
-from typing import Optional, Union
+from typing import Callable, NamedTuple, Optional, Union
 from eodal.config import get_settings
+from eodal.utils.exceptions import DataNotFoundError
 
 Settings = get_settings()
 logger = Settings.logger
 
 # fixed chunk size for downloading data
 CHUNK_SIZE = 2096
+# time (seconds) a keycloak token is re-used by parallel downloads
+KEYCLOAK_REUSE_SECONDS = 60
+
+# a one-time access code can be used only once, therefore, parallel downloads
+# share the keycloak token instead of requesting one each
+_keycloak_lock = threading.Lock()
+_keycloak_token = {"token": None, "time": 0.}
 
 
 def get_totp() -> str:
@@ -105,10 +114,169 @@ def get_keycloak() -> str:
         return get_keycloak()
 
 
+def query_creodias_split(
+    query_func: Callable[..., pd.DataFrame],
+    start_date: date,
+    end_date: date,
+    max_records: int,
+    n_splits: Optional[int] = 4,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Runs a CREODIAS Finder API query and splits it into shorter
+    sub-periods queried in parallel if the number of returned datasets
+    reaches `max_records` (i.e., the results were most likely truncated).
+    The sub-periods are split further if required.
+
+    :param query_func:
+        sensor-specific CREODIAS query function, e.g.,
+        `~eodal.downloader.sentinel2.creodias.query_creodias`
+    :param start_date:
+        start date of the queried time period (inclusive)
+    :param end_date:
+        end date of the queried time period (inclusive)
+    :param max_records:
+        maximum number of items returned by a single query.
+    :param n_splits:
+        number of sub-periods a truncated query is split into.
+    :param kwargs:
+        further key-word arguments to pass to `query_func`
+    :return:
+        results of the CREODIAS Finder API as pandas DataFrame
+    """
+    datasets = query_func(
+        start_date=start_date,
+        end_date=end_date,
+        max_records=max_records,
+        **kwargs
+    )
+    n_days = (end_date - start_date).days + 1
+    if datasets.shape[0] < max_records or n_days == 1:
+        return datasets
+
+    # split the time period into sub-periods of full days
+    n_splits = max(2, min(n_splits, n_days))
+    bounds = [start_date + timedelta(days=n_days * i // n_splits)
+              for i in range(n_splits + 1)]
+    periods = [
+        (bounds[i], bounds[i + 1] - timedelta(days=1)) for i in range(n_splits)
+    ]
+
+    def _query_period(period: tuple[date, date]) -> pd.DataFrame:
+        try:
+            return query_creodias_split(
+                query_func,
+                start_date=period[0],
+                end_date=period[1],
+                max_records=max_records,
+                n_splits=n_splits,
+                **kwargs
+            )
+        except DataNotFoundError:
+            return pd.DataFrame()
+
+    with ThreadPoolExecutor(max_workers=n_splits) as executor:
+        results = [x for x in executor.map(_query_period, periods) if not x.empty]
+    if len(results) == 0:
+        return datasets
+    datasets = pd.concat(results, ignore_index=True)
+    return datasets.drop_duplicates(subset="dataset_name", ignore_index=True)
+
+
+def _get_shared_keycloak() -> str:
+    """
+    Returns a keycloak token shared between parallel downloads. A new
+    token is requested if the current one is older than
+    `KEYCLOAK_REUSE_SECONDS`.
+
+    :return: keycloak access token
+    """
+    with _keycloak_lock:
+        if time.monotonic() - _keycloak_token["time"] > KEYCLOAK_REUSE_SECONDS:
+            _keycloak_token["token"] = get_keycloak()
+            _keycloak_token["time"] = time.monotonic()
+        return _keycloak_token["token"]
+
+
+def _download_dataset(
+    dataset: NamedTuple,
+    download_dir: Path,
+    overwrite_existing_zips: bool,
+    scene_counter: int,
+    n_datasets: int,
+) -> None:
+    """
+    Downloads a single dataset from CREODIAS.
+
+    :param dataset:
+        single record of the results of a CREODIAS Finder API request
+    :param download_dir:
+        directory where to store the downloaded file
+    :param overwrite_existing_zips:
+        if set to False, existing zip files are not overwritten.
+    :param scene_counter:
+        number of the dataset (for logging)
+    :param n_datasets:
+        total number of datasets to download (for logging)
+    """
+    # check if the dataset exists already and overwrite it only if
+    # defined by the user
+    fname = dataset.dataset_name.replace("SAFE", "zip")
+    if not fname.endswith("zip"):
+        fname = fname + ".zip"
+    fpath = download_dir.joinpath(fname)
+    if fpath.exists():
+        if not overwrite_existing_zips:
+            logger.info(
+                f"{dataset.dataset_name} already downloaded - " +
+                "continue with next dataset"
+            )
+            return
+        else:
+            logger.warning(f"Overwriting {dataset.dataset_name}")
+
+    dataset_url = dataset.properties["services"]["download"]["url"]
+    try:
+        # get API token from CREODIAS (only valid for a limited time)
+        keycloak_token = _get_shared_keycloak()
+        dataset_temp_url = dataset_url.split('/')[-1]
+        dataset_url = f'{Settings.CREODIAS_ZIPPER_URL}/{dataset_temp_url}'
+        response = requests.get(
+            dataset_url,
+            headers={"Authorization": f"Bearer {keycloak_token}"},
+            stream=True,
+        )
+        response.raise_for_status()
+    except Exception as e:
+        logger.error(f"Could not download {dataset_url}: {e}")
+        return
+
+    # download the data using the iter_content method (writes chunks to disk)
+    logger.info(
+        f"Starting downloading {fname} ({scene_counter}/{n_datasets})"
+    )
+    try:
+        with open(fpath, "wb") as fd:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                fd.write(chunk)
+        logger.info(
+            f"Finished downloading {fname} ({scene_counter}/{n_datasets})"
+        )
+    except Exception as e:
+        # on error (e.g., broken network connection) delete the incomplete
+        # zip archive and continue.
+        fpath.unlink(missing_ok=True)
+        logger.error(
+            f'Downloading {fname} ({scene_counter}/{n_datasets}) ' +
+            f'was interrupted.\n{e}\nRemoved broken zip.\n' +
+            'Consider re-running the download.')
+
+
 def download_datasets(
     datasets: pd.DataFrame,
     download_dir: Union[Path, str],
     overwrite_existing_zips: Optional[bool] = False,
+    max_workers: Optional[int] = None,
 ) -> None:
     """
     Function for actual dataset download from CREODIAS.
@@ -126,66 +294,32 @@ def download_datasets(
         useful to restart the downloader after a network connection
         timeout or similar. NOTE: Thhe function does not check if
         the existing zips are complete!
+    :param max_workers:
+        number of datasets downloaded in parallel. Defaults to
+        `CREODIAS_MAX_DOWNLOAD_WORKERS` in the BaseSettings. Set to 1
+        to download the datasets sequentially.
     """
+    if max_workers is None:
+        max_workers = Settings.CREODIAS_MAX_DOWNLOAD_WORKERS
 
-    # change into download directory
-    os.chdir(str(download_dir))
-
-    # loop over datasets to download them sequentially
-    scene_counter = 1
-    for _, dataset in datasets.iterrows():
-        try:
-            # get API token from CREODIAS (only valid for a limited time)
-            keycloak_token = get_keycloak()
-            dataset_temp_url = dataset.properties["services"]["download"]["url"].split('/')[-1]
-            dataset_url = f'{Settings.CREODIAS_ZIPPER_URL}/{dataset_temp_url}'
-            response = requests.get(
-                dataset_url,
-                headers={"Authorization": f"Bearer {keycloak_token}"},
-                stream=True,
+    n_datasets = datasets.shape[0]
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [
+            executor.submit(
+                _download_dataset,
+                dataset,
+                Path(download_dir),
+                overwrite_existing_zips,
+                scene_counter,
+                n_datasets,
             )
-            response.raise_for_status()
-        except Exception as e:
-            logger.error(f"Could not download {dataset_url}: {e}")
-            continue
-
-        # download the data using the iter_content method (writes chunks to disk)
-        # check if the dataset exists already and overwrite it only if
-        # defined by the user
-        fname = dataset.dataset_name.replace("SAFE", "zip")
-        if not fname.endswith("zip"):
-            fname = fname + ".zip"
-        if Path(fname).exists():
-            if not overwrite_existing_zips:
-                logger.info(
-                    f"{dataset.dataset_name} already downloaded - " +
-                    "continue with next dataset"
-                )
-                scene_counter += 1
-                continue
-            else:
-                logger.warning(f"Overwriting {dataset.dataset_name}")
-
-        logger.info(
-            f"Starting downloading {fname} ({scene_counter}/{datasets.shape[0]})"
-        )
-        try:
-            with open(fname, "wb") as fd:
-                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
-                    fd.write(chunk)
-            logger.info(
-                f"Finished downloading {fname} ({scene_counter}/{datasets.shape[0]})"
+            for scene_counter, dataset in enumerate(
+                datasets.itertuples(index=False), 1
             )
-        except Exception as e:
-            # on error (e.g., broken network connection) delete the incomplete
-            # zip archive and continue.
-            shutil.rmtree(fname)
-            logger.error(
-                f'Downloading {fname} ({scene_counter}/{datasets.shape[0]}) ' +
-                f'was interrupted.\n{e}\nRemoved broken zip.\n' +
-                'Consider re-running the download.')
-            
-        scene_counter += 1
+        ]
+        # propagate unexpected errors
+        for future in futures:
+            future.result()
 
 
 # # unit test (requires credentials for CREODIAS)
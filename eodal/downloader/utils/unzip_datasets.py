@@ -56,20 +56,17 @@ def unzip_datasets(
             f'Could not find any zips for platform "{platform}" in {download_dir}'
         )
 
-    # change into the donwload directory
-    current_dir = os.getcwd()
-
-    # use unzip in subprocess call to unpack the zip files
+    # use unzip in subprocess call to unpack the zip files in the download
+    # directory (the working directory of the process is not changed)
     for idx, dot_safe_zip in enumerate(dot_safe_zips):
-        os.chdir(download_dir)
-        arg_list = ["unzip", "-n", Path(dot_safe_zip).name]
+        arg_list = ["unzip", "-n", os.path.basename(dot_safe_zip)]
         process = subprocess.Popen(
-            arg_list, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            arg_list, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            cwd=download_dir
         )
         _, _ = process.communicate()
 
         logger.info(f"Unzipped {dot_safe_zip} ({idx+1}/{n_zips})")
 
-        os.chdir(current_dir)
         if remove_zips:
             os.remove(dot_safe_zip)
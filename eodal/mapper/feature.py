@@ -46,6 +46,8 @@ class Feature:
         optional attributes of the feature
     """
 
+    __slots__ = ("_name", "_geometry", "_epsg", "_attributes")
+
     def __init__(
         self,
         name: str,
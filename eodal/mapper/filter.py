@@ -19,10 +19,37 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import annotations
 
+import ast
+import operator as op
+
 from typing import Any
 
 operators = ["<", "<=", "==", "!=", ">", ">="]
 
+# comparison functions the operators are dispatched to
+_operator_funcs = {
+    "<": op.lt,
+    "<=": op.le,
+    "==": op.eq,
+    "!=": op.ne,
+    ">": op.gt,
+    ">=": op.ge,
+}
+
+
+def _parse_literal(value: Any) -> Any:
+    """
+    Parses a filter value passed as string into a Python literal (e.g., a
+    number) to compare it against non-string metadata values. Strings that
+    are not a literal and values of other types are returned unchanged.
+    """
+    if not isinstance(value, str):
+        return value
+    try:
+        return ast.literal_eval(value.strip())
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return value
+
 
 class Filter:
     """
@@ -73,6 +100,13 @@ class Filter:
         self._operator = operator
         self._value = value
 
+        # resolve the comparison once so that evaluating the filter on
+        # many scenes does not require parsing the expression again
+        self._op = _operator_funcs[operator]
+        self._value_str = str(value)
+        self._value_literal = _parse_literal(value)
+        self._value_set = frozenset(value if isinstance(value, list) else [value])
+
     def __repr__(self) -> str:
         return self.expression
 
@@ -95,3 +129,27 @@ class Filter:
     def expression(self) -> str:
         """returns the filter expression as string"""
         return f"{self.entity} {self.operator} {self.value}"
+
+    def evaluate(self, metadata_value: Any) -> bool:
+        """
+        Checks if a metadata value fulfills the filter condition.
+
+        String values are compared against the string representation of the
+        filter value, other values against the filter value parsed as Python
+        literal (i.e., `"10"` matches a metadata value of `10`). If the
+        metadata value is a list, "==" checks if the filter value(s) are a
+        subset of the list and "!=" if they are not.
+
+        :param metadata_value:
+            metadata value on the left-hand side of the filter expression
+        :returns:
+            `True` if the filter condition is met, `False` otherwise
+        """
+        if isinstance(metadata_value, list):
+            if self._operator == "==":
+                return self._value_set.issubset(metadata_value)
+            if self._operator == "!=":
+                return not self._value_set.issubset(metadata_value)
+        if isinstance(metadata_value, str):
+            return self._op(metadata_value, self._value_str)
+        return self._op(metadata_value, self._value_literal)
@@ -22,10 +22,10 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import annotations
 
-import cv2
 import eodal
 import geopandas as gpd
 import getpass
+import importlib
 import numpy as np
 import pandas as pd
 import warnings
@@ -47,7 +47,8 @@ from eodal.core.scene import SceneCollection
 from eodal.mapper.feature import Feature
 from eodal.mapper.filter import Filter
 from eodal.metadata.database.querying import find_raw_data_by_bbox
-from eodal.metadata.utils import reconstruct_path
+from eodal.metadata.utils import reconstruct_paths
+from eodal.utils.constants import INTER_NEAREST_EXACT
 from eodal.utils.exceptions import STACError
 
 settings = get_settings()
@@ -78,6 +79,15 @@ class MapperConfigs:
         data was read from including the STAC API end point URL.
     """
 
+    __slots__ = (
+        "_collection",
+        "_feature",
+        "_time_start",
+        "_time_end",
+        "_metadata_filters",
+        "_data_source",
+    )
+
     def __init__(
         self,
         collection: str,
@@ -267,6 +277,15 @@ class Mapper:
         corresponding scene metadata as `GeoDataFrame`.
     """
 
+    __slots__ = (
+        "_mapper_configs",
+        "_time_column",
+        "_metadata",
+        "_sensor",
+        "_data",
+        "_geoms_are_points",
+    )
+
     def __init__(
         self, mapper_configs: MapperConfigs, time_column: Optional[str] = "sensing_time"
     ):
@@ -381,8 +400,8 @@ class Mapper:
         # query the metadata catalog (STAC or database depending on settings)
         if settings.USE_STAC:
             try:
-                exec(f"from eodal.metadata.stac import {platform}")
-                scenes_df = eval(f"{platform}(**kwargs)")
+                stac = importlib.import_module("eodal.metadata.stac")
+                scenes_df = getattr(stac, platform)(**kwargs)
             except Exception as e:
                 raise STACError(f"Querying STAC catalog failed: {e}")
         else:
@@ -470,7 +489,7 @@ class Mapper:
 
     def _load_scenes_collection(
         self,
-        reprojection_method: Optional[int] = cv2.INTER_NEAREST_EXACT,
+        reprojection_method: Optional[int] = INTER_NEAREST_EXACT,
         scene_constructor: Optional[
             Callable[..., RasterCollection]
         ] = RasterCollection.from_multi_band_raster,
@@ -572,17 +591,17 @@ class Mapper:
         # mosaic the non-unique datasets first
         if not _metadata_nonunique.empty:
             _metadata_nonunique.sort_values(by=self.time_column, inplace=True)
-            unique_time_stamps = _metadata_nonunique[self.time_column].unique()
-            # loop over unique time stamps. In the end there should be a single
-            # scene per time stamp
+            # loop over unique time stamps (at minute precision). In the end
+            # there should be a single scene per time stamp. The time stamps
+            # are formatted once and the scenes are grouped by them instead
+            # of comparing all time stamps again for each unique time stamp
+            minute_time_stamps = _metadata_nonunique[self.time_column].dt.strftime(
+                "%Y-%m-%d %H:%M"
+            )
             update_scene_properties_list = []
-            for unique_time_stamp in unique_time_stamps:
-                scenes = _metadata_nonunique[
-                    _metadata_nonunique[self.time_column].dt.strftime("%Y-%m-%d %H:%M")
-                    == pd.to_datetime(unique_time_stamp).strftime("%Y-%m-%d %H:%M")[
-                        0:16
-                    ]
-                ]
+            for _, scenes in _metadata_nonunique.groupby(
+                minute_time_stamps, sort=True
+            ):
                 # read the datasets one by one, save them into a temporary directory
                 # and merge them using rasterio
                 dataset_list = []
@@ -619,13 +638,13 @@ class Mapper:
                 for other_scene_properties in scene_properties_list[1::]:
                     scene_props_keys = list(merged_scene_properties.__dict__.keys())
                     for scene_prop in scene_props_keys:
-                        first_val = eval(f"merged_scene_properties.{scene_prop}")
-                        this_val = eval(f"other_scene_properties.{scene_prop}")
+                        first_val = getattr(merged_scene_properties, scene_prop)
+                        this_val = getattr(other_scene_properties, scene_prop)
                         if first_val != this_val:
                             # only string values can be merged (connected by '&&')
                             if isinstance(first_val, str):
-                                new_val = first_val + "&&" + this_val  # noqa: F841
-                                exec(f"merged_scene_properties.{scene_prop} = new_val")
+                                new_val = first_val + "&&" + this_val
+                                setattr(merged_scene_properties, scene_prop, new_val)
 
                 scene.scene_properties = merged_scene_properties
                 # because ESA has some mess with the naming of their file names and
@@ -662,8 +681,8 @@ class Mapper:
                     < pd.Timedelta(60, unit="minutes")
                 ].index
                 for scene_property in updated_scene_properties.__dict__:
-                    self.metadata.loc[idx, scene_property] = eval(
-                        f"updated_scene_properties.{scene_property}"
+                    self.metadata.loc[idx, scene_property] = getattr(
+                        updated_scene_properties, scene_property
                     )
 
         # then add those scenes that are unique, i.e., no mosaicing is required
@@ -895,9 +914,7 @@ class Mapper:
         if settings.USE_STAC:
             self.metadata["real_path"] = self.metadata["assets"]
         else:
-            self.metadata["real_path"] = self.metadata.apply(
-                lambda x: reconstruct_path(record=x), axis=1
-            )
+            self.metadata["real_path"] = reconstruct_paths(self.metadata)
 
         # load the data depending on the geometry type of the feature(s)
         if self._geoms_are_points:
@@ -5,3 +5,4 @@ from .db_model import S1_Raw_Metadata
 from .db_model import PS_SuperDove_Metadata
 
 from .ingestion import add_region
+from .ingestion import insert_records
@@ -22,6 +22,7 @@ from __future__ import annotations
 from sqlalchemy import create_engine
 from sqlalchemy import MetaData
 from sqlalchemy import ForeignKeyConstraint
+from sqlalchemy import Index
 from sqlalchemy.orm import declarative_base
 from sqlalchemy import Column, String, Float, Date, Integer, Text, Boolean, TIMESTAMP
 from geoalchemy2 import Geometry
@@ -169,6 +170,18 @@ class S2_Raw_Metadata(Base):
         String, nullable=False, comment="type of the path (e.g., POSIX-Path)"
     )
 
+    # covering index for querying scenes by tile, processing level, time period
+    # and cloud cover (see `find_raw_data_by_tile`)
+    __table_args__ = (
+        Index(
+            "idx_s2raw_tile_proclvl_date_cc",
+            "tile_id",
+            "processing_level",
+            "sensing_date",
+            postgresql_include=["cloudy_pixel_percentage"],
+        ),
+    )
+
 
 class S2_Processed_Metadata(Base):
     __tablename__ = "sentinel2_processed_metadata"
@@ -255,12 +268,17 @@ class PS_SuperDove_Metadata(Base):
 def create_tables() -> None:
     """
     creates all Sentinel-2 related tables in the current
-    <DEFAULT_SCHEMA>.
+    <DEFAULT_SCHEMA>. Indices missing on already existing tables
+    are added.
     """
     try:
         Base.metadata.create_all(bind=engine)
         for table in Base.metadata.tables.keys():
             logger.info(f"Created table {table}")
+        # create_all only creates the indices of newly created tables
+        for table in Base.metadata.tables.values():
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
     except Exception as e:
         raise Exception(f"Could not create table: {e}")
 
@@ -24,7 +24,10 @@ import geopandas as gpd
 
 from pathlib import Path
 from sqlalchemy import create_engine
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
 from sqlalchemy.orm import sessionmaker
+from typing import Any, Dict, List, Optional
 
 from eodal.config import get_settings
 from eodal.metadata.database.db_model import Regions
@@ -72,3 +75,49 @@ def add_region(region_identifier: str, region_file: Path) -> None:
     except Exception as e:
         logger.error(f'Insert of region "{region_identifier} failed: {e}')
         session.rollback()
+
+
+def insert_records(
+    db_session: Session,
+    model: Any,
+    records: List[Dict[str, Any]],
+    batch_size: Optional[int] = 2000,
+) -> List[int]:
+    """
+    Inserts records into a table of the database. The records are inserted
+    in batches using a single (executemany) INSERT statement and transaction
+    per batch. If a batch fails, its records are inserted one by one within
+    a single transaction using a SAVEPOINT per record so that a single invalid
+    record does not prevent the others from being inserted.
+
+    :param db_session:
+        database session to use
+    :param model:
+        data model (table) to insert the records into
+    :param records:
+        records to insert as dictionaries with lower-case column names
+    :param batch_size:
+        number of records inserted per batch
+    :returns:
+        positions of the records that could not be inserted
+    """
+    failed = []
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        try:
+            db_session.execute(insert(model), batch)
+            db_session.commit()
+            continue
+        except Exception as e:
+            db_session.rollback()
+            logger.debug(f"Batch INSERT failed, inserting records one by one: {e}")
+        for idx, record in enumerate(batch, start):
+            try:
+                # only the failing record is rolled back to its savepoint
+                with db_session.begin_nested():
+                    db_session.execute(insert(model), [record])
+            except Exception as e:
+                logger.error(f"Database INSERT failed: {e}")
+                failed.append(idx)
+        db_session.commit()
+    return failed
@@ -1,2 +1,3 @@
-from .ingestion import metadata_dict_to_database
-from .querying import find_raw_data_by_bbox
+from .ingestion import metadata_dict_to_database, metadata_dicts_to_database, \
+    scenes_to_database
+from .querying import find_raw_data_by_bbox, get_existing_scene_ids
@@ -19,11 +19,16 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from sqlalchemy import create_engine
-from sqlalchemy import and_
 from sqlalchemy.orm import sessionmaker
+from typing import Any, Dict, List, Optional
 
 from eodal.metadata.database.db_model import PS_SuperDove_Metadata
+from eodal.metadata.database.ingestion import insert_records
+from eodal.metadata.planet_scope.database.querying import get_existing_scene_ids
+from eodal.metadata.planet_scope.parsing import parse_metadata
 from eodal.config import get_settings
 
 Settings = get_settings()
@@ -55,10 +60,100 @@ def metadata_dict_to_database(metadata: dict) -> None:
     session.commit()
 
 
-if __name__ == "__main__":
-    from pathlib import Path
-    from eodal.metadata.planet_scope.parsing import parse_metadata
+def metadata_dicts_to_database(
+    metadata_list: List[Dict[str, Any]],
+    batch_size: Optional[int] = 500,
+) -> int:
+    """
+    Inserts the extracted metadata of many scenes into the meta database.
+    The scenes are inserted in batches using a single (executemany) INSERT
+    statement and transaction per batch. Scenes of a failing batch are
+    inserted one by one so that a single invalid scene does not prevent
+    the others from being inserted.
+
+    :param metadata_list:
+        list of dictionaries with the extracted metadata
+    :param batch_size:
+        number of scenes inserted per batch
+    :returns:
+        number of scenes inserted
+    """
+    # convert keys to lower case
+    records = [
+        {k.lower(): v for k, v in metadata.items()} for metadata in metadata_list
+    ]
+    failed = insert_records(
+        db_session=session,
+        model=PS_SuperDove_Metadata,
+        records=records,
+        batch_size=batch_size,
+    )
+    return len(records) - len(failed)
+
+
+def _parse_scene(in_dir: Path) -> Optional[Dict[str, Any]]:
+    """
+    Parses the metadata of a single Planet-Scope scene. Returns None
+    if the metadata could not be parsed.
 
+    :param in_dir:
+        PS scene directory where metadata and image files are located
+    :returns:
+        parsed metadata or None
+    """
+    try:
+        return parse_metadata(in_dir)
+    except Exception as e:
+        logger.error(f"Could not parse metadata of {in_dir}: {e}")
+        return None
+
+
+def scenes_to_database(
+    ps_raw_data_archive: Path,
+    max_workers: Optional[int] = 8,
+    batch_size: Optional[int] = 500,
+) -> None:
+    """
+    Ingests the metadata of all Planet-Scope scenes in an archive into the
+    meta database. The metadata files are parsed in parallel and inserted
+    in batches. Scenes already in the database are skipped.
+
+    :param ps_raw_data_archive:
+        directory with Planet-Scope scenes (one sub-directory per scene)
+    :param max_workers:
+        number of scenes parsed in parallel
+    :param batch_size:
+        number of scenes looked up and inserted into the database at once
+    """
+    scene_dirs = [x for x in Path(ps_raw_data_archive).iterdir() if x.is_dir()]
+    n_ingested, n_existing = 0, 0
+
+    def _flush(buffer: List[Dict[str, Any]]) -> None:
+        nonlocal n_ingested, n_existing
+        # look up the scenes already in the database at once
+        existing = get_existing_scene_ids([x["scene_id"] for x in buffer])
+        new_scenes = [x for x in buffer if x["scene_id"] not in existing]
+        n_ingested += metadata_dicts_to_database(new_scenes, batch_size=batch_size)
+        n_existing += len(existing)
+
+    buffer = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for metadata in executor.map(_parse_scene, scene_dirs):
+            if metadata is None:
+                continue
+            buffer.append(metadata)
+            if len(buffer) == batch_size:
+                _flush(buffer)
+                buffer = []
+    if len(buffer) > 0:
+        _flush(buffer)
+    logger.info(
+        f"Ingested {n_ingested} scenes into DB "
+        f"({n_existing} scenes already ingested)"
+    )
+
+
+if __name__ == "__main__":
     in_dir = Path("/mnt/ides/Lukas/software/eodal/data/20220414_101133_47_227b")
     metadata = parse_metadata(in_dir)
     metadata_dict_to_database(metadata)
@@ -34,7 +34,9 @@ from sqlalchemy import create_engine
 from sqlalchemy import and_
 from sqlalchemy import asc
 from sqlalchemy.orm import sessionmaker
+from typing import Iterable
 from typing import Optional
+from typing import Set
 from typing import Union
 
 from eodal.config import get_settings
@@ -142,3 +144,22 @@ def get_scene_metadata(scene_id: str) -> pd.DataFrame:
         raise DataNotFoundError(
             "Could not find Planet-Scope scene with product_uri " f"{scene_id}: {e}"
         )
+
+
+def get_existing_scene_ids(scene_ids: Iterable[str]) -> Set[str]:
+    """
+    Returns the subset of Planet-Scope scene identifiers that are already
+    in the metadata DB using a single query.
+
+    :param scene_ids:
+        unique scene identifiers provided by Planet in the metadata *.json files
+    :returns:
+        scene identifiers found in the metadata DB
+    """
+    scene_ids = list(scene_ids)
+    if len(scene_ids) == 0:
+        return set()
+    query = session.query(PS_SuperDove_Metadata.scene_id).filter(
+        PS_SuperDove_Metadata.scene_id.in_(scene_ids)
+    )
+    return {row.scene_id for row in query}
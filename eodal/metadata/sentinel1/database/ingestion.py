@@ -24,9 +24,10 @@ import pandas as pd
 
 from sqlalchemy import and_, create_engine
 from sqlalchemy.orm import sessionmaker
-from typing import List
+from typing import List, Optional
 
 from eodal.metadata.database.db_model import S1_Raw_Metadata
+from eodal.metadata.database.ingestion import insert_records
 from eodal.config import get_settings
 
 Settings = get_settings()
@@ -39,29 +40,30 @@ engine = create_engine(DB_URL, echo=Settings.ECHO_DB)
 session = sessionmaker(bind=engine)()
 
 
-def meta_df_to_database(meta_df: pd.DataFrame) -> None:
+def meta_df_to_database(
+    meta_df: pd.DataFrame,
+    batch_size: Optional[int] = 2000,
+) -> List[int]:
     """
     Once the metadata from one or more mapper have been extracted
     the data can be ingested into the metadata base (strongly
-    recommended).
+    recommended). The records are inserted in batches.
 
     :param meta_df:
         data frame with metadata of one or more mapper to insert
-    :param raw_metadata:
-        If set to False, assumes the metadata is about processed
-        products
+    :param batch_size:
+        number of records inserted at once
+    :returns:
+        positions of the records in meta_df that could not be inserted
     """
 
     meta_df.columns = meta_df.columns.str.lower()
-    for _, record in meta_df.iterrows():
-        metadata = record.to_dict()
-        try:
-            session.add(S1_Raw_Metadata(**metadata))
-            session.flush()
-        except Exception as e:
-            logger.error(f"Database INSERT failed: {e}")
-            session.rollback()
-    session.commit()
+    return insert_records(
+        db_session=session,
+        model=S1_Raw_Metadata,
+        records=meta_df.to_dict(orient="records"),
+        batch_size=batch_size,
+    )
 
 
 def metadata_dict_to_database(metadata: dict) -> None:
@@ -30,18 +30,24 @@ import pandas as pd
 
 from datetime import date
 from geoalchemy2.functions import ST_Intersects
-from geoalchemy2.functions import ST_GeomFromText
-from shapely.geometry import Polygon
+from geoalchemy2.functions import ST_GeomFromWKB
+from shapely import wkb
+from shapely.geometry.base import BaseGeometry
 from sqlalchemy import create_engine
 from sqlalchemy import and_
 from sqlalchemy import asc
+from sqlalchemy import bindparam
+from sqlalchemy import select
 from sqlalchemy.orm import sessionmaker
+from typing import Iterable
 from typing import Optional
+from typing import Set
 from typing import Union
 
 from eodal.config import get_settings
 from eodal.metadata.database import S1_Raw_Metadata
 from eodal.utils.exceptions import DataNotFoundError
+from eodal.utils.geometry import geometry_from_ewkt
 
 Settings = get_settings()
 logger = Settings.logger
@@ -52,11 +58,36 @@ DB_URL = f"postgresql://{Settings.DB_USER}:" + \
 engine = create_engine(DB_URL, echo=Settings.ECHO_DB)
 session = sessionmaker(bind=engine)()
 
+# the bounding box query is constructed once at module level so that SQLAlchemy
+# can re-use its compiled form; only the bound parameters change per call
+_S1_BBOX_STMT = (
+    select(
+        S1_Raw_Metadata.product_uri,
+        S1_Raw_Metadata.scene_id,
+        S1_Raw_Metadata.spacecraft_name,
+        S1_Raw_Metadata.storage_share,
+        S1_Raw_Metadata.storage_device_ip_alias,
+        S1_Raw_Metadata.storage_device_ip,
+        S1_Raw_Metadata.sensing_date,
+        S1_Raw_Metadata.instrument_mode,
+        S1_Raw_Metadata.sensing_orbit_direction,
+        S1_Raw_Metadata.sensing_time,
+        S1_Raw_Metadata.relative_orbit_start,
+        S1_Raw_Metadata.relative_orbit_stop,
+    )
+    .where(
+        ST_Intersects(S1_Raw_Metadata.geom, ST_GeomFromWKB(bindparam("wkb"), 4326))
+    )
+    .where(S1_Raw_Metadata.sensing_date.between(bindparam("d0"), bindparam("d1")))
+    .where(S1_Raw_Metadata.instrument_mode == bindparam("mode"))
+    .where(S1_Raw_Metadata.product_type == bindparam("ptype"))
+)
+
 
 def find_raw_data_by_bbox(
     date_start: date,
     date_end: date,
-    bounding_box: Union[Polygon, str],
+    bounding_box: Union[BaseGeometry, str, bytes],
     product_type: Optional[str] = "GRD",
     sensor_mode: Optional[str] = "IW",
 ) -> pd.DataFrame:
@@ -74,7 +105,7 @@ def find_raw_data_by_bbox(
         end date of the time period
     :param bounding_box:
         bounding box either as extended well-known text in geographic coordinates
-        or as shapely ``Polygon`` in geographic coordinates (WGS84)
+        or as shapely geometry in geographic coordinates (WGS84)
     :param product_type:
         Sentinel-1 product type. 'GRD' (Ground Range Detected) by default.
     :param sensor_mode:
@@ -82,44 +113,40 @@ def find_raw_data_by_bbox(
     :returns:
         `DataFrame` with references to found Sentinel-2 mapper
     """
-    # convert shapely geometry into extended well-known text representation
-    if isinstance(bounding_box, Polygon):
-        bounding_box = f"SRID=4326;{bounding_box.wkt}"
-
-    # formulate the query statement using the spatial and time period filter
-    query_statement = (
-        session.query(
-            S1_Raw_Metadata.product_uri,
-            S1_Raw_Metadata.scene_id,
-            S1_Raw_Metadata.spacecraft_name,
-            S1_Raw_Metadata.storage_share,
-            S1_Raw_Metadata.storage_device_ip_alias,
-            S1_Raw_Metadata.storage_device_ip,
-            S1_Raw_Metadata.sensing_date,
-            S1_Raw_Metadata.instrument_mode,
-            S1_Raw_Metadata.sensing_orbit_direction,
-            S1_Raw_Metadata.sensing_time,
-            S1_Raw_Metadata.relative_orbit_start,
-            S1_Raw_Metadata.relative_orbit_stop,
-        )
-        .filter(ST_Intersects(S1_Raw_Metadata.geom, ST_GeomFromText(bounding_box)))
-        .filter(
-            and_(
-                S1_Raw_Metadata.sensing_date <= date_end,
-                S1_Raw_Metadata.sensing_date >= date_start,
-            )
+    # parse extended well-known text into a shapely geometry
+    if isinstance(bounding_box, str):
+        bounding_box = geometry_from_ewkt(bounding_box)
+
+    # degenerate inputs cannot match any record -> skip the DB round trip
+    # (points and lines have no area but can still intersect a scene)
+    if date_end < date_start or (
+        isinstance(bounding_box, BaseGeometry)
+        and (
+            bounding_box.is_empty
+            or (bounding_box.geom_type.endswith("Polygon") and bounding_box.area == 0)
         )
-        .filter(S1_Raw_Metadata.instrument_mode == sensor_mode)
-        .filter(S1_Raw_Metadata.product_type <= product_type)
-        .order_by(S1_Raw_Metadata.sensing_date.asc())
-        .statement
-    )
+    ):
+        return pd.DataFrame(columns=_S1_BBOX_STMT.selected_columns.keys())
+
+    # convert the bounding box into well-known binary representation since
+    # parsing binary is cheaper for PostGIS than parsing (extended) text
+    if isinstance(bounding_box, BaseGeometry):
+        bounding_box = wkb.dumps(bounding_box)
 
     # read returned records in DataFrame and return
+    params = {
+        "wkb": bounding_box,
+        "d0": date_start,
+        "d1": date_end,
+        "mode": sensor_mode,
+        "ptype": product_type,
+    }
     try:
-        return pd.read_sql(query_statement, session.bind)
+        df = pd.read_sql(_S1_BBOX_STMT, session.bind, params=params)
     except Exception as e:
         raise DataNotFoundError(f"Could not find Sentinel-1 data by bounding box: {e}")
+    # sorting the (small) result set client-side is cheaper than in the DB
+    return df.sort_values("sensing_date", kind="mergesort", ignore_index=True)
 
 
 def get_scene_metadata(product_uri: str) -> pd.DataFrame:
@@ -144,3 +171,29 @@ def get_scene_metadata(product_uri: str) -> pd.DataFrame:
         raise DataNotFoundError(
             "Could not find Sentinel-2 scene with product_uri " f"{product_uri}: {e}"
         )
+
+
+def get_existing_product_uris(
+    product_uris: Iterable[str],
+    chunk_size: Optional[int] = 1000,
+) -> Set[str]:
+    """
+    Returns the subset of Sentinel-1 product URIs that are already in the
+    metadata DB. Instead of looking up each scene separately, the product
+    URIs are queried using IN statements of `chunk_size` URIs each.
+
+    :param product_uris:
+        unique product identifiers (.SAFE names of the datasets)
+    :param chunk_size:
+        maximum number of product URIs per query
+    :returns:
+        product URIs found in the metadata DB
+    """
+    product_uris = list(product_uris)
+    existing = set()
+    for idx in range(0, len(product_uris), chunk_size):
+        query = session.query(S1_Raw_Metadata.product_uri).filter(
+            S1_Raw_Metadata.product_uri.in_(product_uris[idx:idx + chunk_size])
+        )
+        existing.update(row.product_uri for row in query)
+    return existing
@@ -20,7 +20,6 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import annotations
 
-import glob
 import numpy as np
 import os
 import pandas as pd
@@ -98,9 +97,7 @@ def parse_s1_metadata(in_dir: Path) -> Dict:
     for elem in domfile.getElementsByTagName("safe:startTime"):
         start_time = elem.firstChild.nodeValue
     metadata["sensing_time"] = datetime.strptime(start_time, "%Y-%m-%dT%H:%M:%S.%f")
-    metadata["sensing_date"] = datetime.strptime(
-        start_time.split("T")[0], "%Y-%m-%d"
-    ).date()
+    metadata["sensing_date"] = metadata["sensing_time"].date()
 
     # instrument_mode
     for elem in domfile.getElementsByTagName("s1sarl1:mode"):
@@ -236,47 +233,53 @@ def loop_s1_archive(
                 "shall be considered"
             )
 
-    # search for .SAFE subdirectories identifying the single mapper
-    # some data providers, however, do not name their products following the
-    # ESA convention (.SAFE is missing)
-    s1_scenes = glob.glob(str(in_dir.joinpath("*.SAFE")))
-    n_scenes = len(s1_scenes)
-
-    if n_scenes == 0:
-        raise DataNotFoundError(f"No .SAFE mapper found in {in_dir}")
-
-    # if only mapper after a specific timestamp shall be considered drop
-    # those from the list which are "too old"
+    # convert date to Unix timestamp
     if get_newest_datasets:
-        filtered_scenes = []
-        # convert date to Unix timestamp
         last_execution = time.mktime(last_execution_date.timetuple())
-        for s1_scene in s1_scenes:
-            s1_scene_path = Path(s1_scene)
-            if s1_scene_path.stat().st_ctime >= last_execution:
-                filtered_scenes.append(s1_scene)
-        s1_scenes = filtered_scenes
-        if len(s1_scenes) == 0:
-            raise DataNotFoundError(
-                'No mapper younger than ' +
-                f'{datetime.strftime(last_execution_date, "%Y-%m-%d")} found'
-            )
 
-    # loop over the mapper
+    # search for .SAFE subdirectories identifying the single mapper
+    # some data providers, however, do not name their products following the
+    # ESA convention (.SAFE is missing).
+    # If only mapper after a specific timestamp shall be considered those which
+    # are "too old" are dropped while scanning the directory (the DirEntry
+    # caches the result of stat). The directory entries are consumed lazily
+    # so that parsing starts before the listing of the archive is complete.
+    n_safe = 0
+    n_scenes = 0
     metadata_scenes = []
-    error_file = open(in_dir.joinpath("errored_datasets.txt"), "w+")
-    for idx, s1_scene in enumerate(s1_scenes):
-        logger.info(
-            f"Extracting metadata of {os.path.basename(s1_scene)} ({idx+1}/{n_scenes})"
+    errored_datasets = []
+    with os.scandir(in_dir) as it:
+        for entry in it:
+            if not entry.name.endswith(".SAFE"):
+                continue
+            n_safe += 1
+            if get_newest_datasets and entry.stat().st_ctime < last_execution:
+                continue
+            n_scenes += 1
+            logger.info(f"Extracting metadata of {entry.name} ({n_scenes})")
+            try:
+                mtd_scene = parse_s1_metadata(in_dir=Path(entry.path))
+            except Exception as e:
+                errored_datasets.append(entry.name)
+                logger.error(f"Extraction of metadata failed {entry.path}: {e}")
+                continue
+            metadata_scenes.append(mtd_scene)
+
+    # write the names of the datasets that could not be parsed at once. The
+    # file is only written if there are any (a stale one is removed)
+    errored_file = in_dir.joinpath("errored_datasets.txt")
+    if errored_datasets:
+        errored_file.write_text("\n".join(errored_datasets))
+    else:
+        errored_file.unlink(missing_ok=True)
+
+    if n_safe == 0:
+        raise DataNotFoundError(f"No .SAFE mapper found in {in_dir}")
+    if n_scenes == 0:
+        raise DataNotFoundError(
+            'No mapper younger than ' +
+            f'{datetime.strftime(last_execution_date, "%Y-%m-%d")} found'
         )
-        try:
-            mtd_scene = parse_s1_metadata(in_dir=Path(s1_scene))
-        except Exception as e:
-            error_file.write(Path(s1_scene).name)
-            error_file.flush()
-            logger.error(f"Extraction of metadata failed {s1_scene}: {e}")
-            continue
-        metadata_scenes.append(mtd_scene)
 
     # convert to pandas dataframe and return
     return pd.DataFrame(metadata_scenes)
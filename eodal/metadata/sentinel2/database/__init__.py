@@ -3,4 +3,9 @@ from .ingestion import (
     metadata_dict_to_database,
     update_raw_metadata,
 )
-from .querying import find_raw_data_by_bbox, find_raw_data_by_tile
+from .querying import (
+    find_raw_data_by_bbox,
+    find_raw_data_by_tile,
+    get_existing_product_uris,
+    summarize_raw_data_by_tile,
+)
@@ -29,6 +29,7 @@ from sqlalchemy.orm import sessionmaker
 
 from eodal.metadata.database.db_model import S2_Raw_Metadata
 from eodal.metadata.database.db_model import S2_Processed_Metadata
+from eodal.metadata.database.ingestion import insert_records
 from eodal.config import get_settings
 
 
@@ -43,8 +44,10 @@ session = sessionmaker(bind=engine)()
 
 
 def meta_df_to_database(
-    meta_df: pd.DataFrame, raw_metadata: Optional[bool] = True
-) -> None:
+    meta_df: pd.DataFrame,
+    raw_metadata: Optional[bool] = True,
+    batch_size: Optional[int] = 2000,
+) -> List[int]:
     """
     Once the metadata from one or more mapper have been extracted
     the data can be ingested into the metadata base (strongly
@@ -52,29 +55,27 @@ def meta_df_to_database(
 
     This function takes a metadata frame extracted from "raw" or
     "processed" (i.e., after spatial resampling, band stacking and merging)
-    Sentinel-2 data and inserts the data via pandas intrinsic
-    sql-methods into the database.
+    Sentinel-2 data and inserts the data in batches into the database.
 
     :param meta_df:
         data frame with metadata of one or more mapper to insert
     :param raw_metadata:
         If set to False, assumes the metadata is about processed
         products
+    :param batch_size:
+        number of records inserted at once
+    :returns:
+        positions of the records in meta_df that could not be inserted
     """
 
     meta_df.columns = meta_df.columns.str.lower()
-    for _, record in meta_df.iterrows():
-        metadata = record.to_dict()
-        try:
-            if raw_metadata:
-                session.add(S2_Raw_Metadata(**metadata))
-            else:
-                session.add(S2_Processed_Metadata(**metadata))
-            session.flush()
-        except Exception as e:
-            logger.error(f"Database INSERT failed: {e}")
-            session.rollback()
-    session.commit()
+    model = S2_Raw_Metadata if raw_metadata else S2_Processed_Metadata
+    return insert_records(
+        db_session=session,
+        model=model,
+        records=meta_df.to_dict(orient="records"),
+        batch_size=batch_size,
+    )
 
 
 def metadata_dict_to_database(metadata: dict) -> None:
@@ -30,13 +30,19 @@ import pandas as pd
 
 from datetime import date
 from geoalchemy2.functions import ST_Intersects
-from geoalchemy2.functions import ST_GeomFromText
-from shapely.geometry import Polygon
+from geoalchemy2.functions import ST_GeomFromWKB
+from shapely import wkb
+from shapely.geometry.base import BaseGeometry
 from sqlalchemy import create_engine
 from sqlalchemy import and_
 from sqlalchemy import asc
+from sqlalchemy import bindparam
+from sqlalchemy import func
+from sqlalchemy import select
 from sqlalchemy.orm import sessionmaker
+from typing import Iterable
 from typing import Optional
+from typing import Set
 from typing import Union
 
 from eodal.config import get_settings
@@ -44,6 +50,7 @@ from eodal.metadata.database import S2_Raw_Metadata
 from eodal.utils.constants import ProcessingLevels
 from eodal.utils.constants.sentinel2 import ProcessingLevelsDB
 from eodal.utils.exceptions import DataNotFoundError
+from eodal.utils.geometry import geometry_from_ewkt
 
 Settings = get_settings()
 logger = Settings.logger
@@ -54,12 +61,41 @@ DB_URL = f"postgresql://{Settings.DB_USER}:" + \
 engine = create_engine(DB_URL, echo=Settings.ECHO_DB)
 session = sessionmaker(bind=engine)()
 
+# the bounding box query is constructed once at module level so that SQLAlchemy
+# can re-use its compiled form; only the bound parameters change per call
+_S2_BBOX_STMT = (
+    select(
+        S2_Raw_Metadata.product_uri,
+        S2_Raw_Metadata.scene_id,
+        S2_Raw_Metadata.tile_id,
+        S2_Raw_Metadata.spacecraft_name,
+        S2_Raw_Metadata.storage_share,
+        S2_Raw_Metadata.storage_device_ip_alias,
+        S2_Raw_Metadata.storage_device_ip,
+        S2_Raw_Metadata.sensing_date,
+        S2_Raw_Metadata.cloudy_pixel_percentage,
+        S2_Raw_Metadata.sensing_orbit_number,
+        S2_Raw_Metadata.sensing_time,
+        S2_Raw_Metadata.epsg,
+        S2_Raw_Metadata.sun_azimuth_angle,
+        S2_Raw_Metadata.sun_zenith_angle,
+        S2_Raw_Metadata.sensor_azimuth_angle,
+        S2_Raw_Metadata.sensor_zenith_angle,
+    )
+    .where(
+        ST_Intersects(S2_Raw_Metadata.geom, ST_GeomFromWKB(bindparam("wkb"), 4326))
+    )
+    .where(S2_Raw_Metadata.sensing_date.between(bindparam("d0"), bindparam("d1")))
+    .where(S2_Raw_Metadata.processing_level == bindparam("plvl"))
+    .where(S2_Raw_Metadata.cloudy_pixel_percentage <= bindparam("ccmax"))
+)
+
 
 def find_raw_data_by_bbox(
     date_start: date,
     date_end: date,
     processing_level: ProcessingLevels,
-    bounding_box: Union[Polygon, str],
+    bounding_box: Union[BaseGeometry, str, bytes],
     cloud_cover_threshold: Optional[Union[int, float]] = 100,
 ) -> pd.DataFrame:
     """
@@ -78,7 +114,7 @@ def find_raw_data_by_bbox(
         Sentinel-2 processing level
     :param bounding_box_wkt:
         bounding box either as extended well-known text in geographic coordinates
-        or as shapely ``Polygon`` in geographic coordinates (WGS84)
+        or as shapely geometry in geographic coordinates (WGS84)
     :param cloud_cover_threshold:
         optional cloud cover threshold to filter datasets by scene cloud coverage.
         Must be provided as number between 0 and 100%.
@@ -89,48 +125,63 @@ def find_raw_data_by_bbox(
     # translate processing level
     processing_level_db = ProcessingLevelsDB[processing_level.name]
 
-    # convert shapely geometry into extended well-known text representation
-    if isinstance(bounding_box, Polygon):
-        bounding_box = f"SRID=4326;{bounding_box.wkt}"
+    # parse extended well-known text into a shapely geometry
+    if isinstance(bounding_box, str):
+        bounding_box = geometry_from_ewkt(bounding_box)
 
-    # formulate the query statement using the spatial and time period filter
-    query_statement = (
-        session.query(
-            S2_Raw_Metadata.product_uri,
-            S2_Raw_Metadata.scene_id,
-            S2_Raw_Metadata.tile_id,
-            S2_Raw_Metadata.spacecraft_name,
-            S2_Raw_Metadata.storage_share,
-            S2_Raw_Metadata.storage_device_ip_alias,
-            S2_Raw_Metadata.storage_device_ip,
-            S2_Raw_Metadata.sensing_date,
-            S2_Raw_Metadata.cloudy_pixel_percentage,
-            S2_Raw_Metadata.sensing_orbit_number,
-            S2_Raw_Metadata.sensing_time,
-            S2_Raw_Metadata.epsg,
-            S2_Raw_Metadata.sun_azimuth_angle,
-            S2_Raw_Metadata.sun_zenith_angle,
-            S2_Raw_Metadata.sensor_azimuth_angle,
-            S2_Raw_Metadata.sensor_zenith_angle,
+    # degenerate inputs cannot match any record -> skip the DB round trip
+    # (points and lines have no area but can still intersect a scene)
+    if date_end < date_start or (
+        isinstance(bounding_box, BaseGeometry)
+        and (
+            bounding_box.is_empty
+            or (bounding_box.geom_type.endswith("Polygon") and bounding_box.area == 0)
         )
-        .filter(ST_Intersects(S2_Raw_Metadata.geom, ST_GeomFromText(bounding_box)))
-        .filter(
-            and_(
-                S2_Raw_Metadata.sensing_date <= date_end,
-                S2_Raw_Metadata.sensing_date >= date_start,
-            )
-        )
-        .filter(S2_Raw_Metadata.processing_level == processing_level_db)
-        .filter(S2_Raw_Metadata.cloudy_pixel_percentage <= cloud_cover_threshold)
-        .order_by(S2_Raw_Metadata.sensing_date.asc())
-        .statement
-    )
+    ):
+        return pd.DataFrame(columns=_S2_BBOX_STMT.selected_columns.keys())
+
+    # convert the bounding box into well-known binary representation since
+    # parsing binary is cheaper for PostGIS than parsing (extended) text
+    if isinstance(bounding_box, BaseGeometry):
+        bounding_box = wkb.dumps(bounding_box)
 
     # read returned records in DataFrame and return
+    params = {
+        "wkb": bounding_box,
+        "d0": date_start,
+        "d1": date_end,
+        "plvl": processing_level_db,
+        "ccmax": cloud_cover_threshold,
+    }
     try:
-        return pd.read_sql(query_statement, session.bind)
+        df = pd.read_sql(_S2_BBOX_STMT, session.bind, params=params)
     except Exception as e:
         raise DataNotFoundError(f"Could not find Sentinel-2 data by bounding box: {e}")
+    # sorting the (small) result set client-side is cheaper than in the DB
+    return df.sort_values("sensing_date", kind="mergesort", ignore_index=True)
+
+
+def _tile_criteria(
+    date_start: date,
+    date_end: date,
+    processing_level: ProcessingLevels,
+    tile: str,
+    cloud_cover_threshold: Optional[Union[int, float]] = 100,
+) -> tuple:
+    """
+    Returns the criteria of a query by Sentinel-2 tile, time period, processing
+    level and cloud cover. The criteria follow the column order of the covering
+    index on (tile_id, processing_level, sensing_date).
+    """
+    # translate processing level
+    processing_level_db = ProcessingLevelsDB[processing_level.name]
+    return (
+        S2_Raw_Metadata.tile_id == tile,
+        S2_Raw_Metadata.processing_level == processing_level_db,
+        S2_Raw_Metadata.sensing_date >= date_start,
+        S2_Raw_Metadata.sensing_date <= date_end,
+        S2_Raw_Metadata.cloudy_pixel_percentage <= cloud_cover_threshold,
+    )
 
 
 def find_raw_data_by_tile(
@@ -158,9 +209,9 @@ def find_raw_data_by_tile(
     :returns:
         dataframe with references to found Sentinel-2 mapper
     """
-
-    # translate processing level
-    processing_level_db = ProcessingLevelsDB[processing_level.name]
+    criteria = _tile_criteria(
+        date_start, date_end, processing_level, tile, cloud_cover_threshold
+    )
 
     query_statement = (
         session.query(
@@ -174,30 +225,66 @@ def find_raw_data_by_tile(
             S2_Raw_Metadata.cloudy_pixel_percentage,
             S2_Raw_Metadata.sensing_orbit_number,
             S2_Raw_Metadata.sensing_time,
-            S2_Raw_Metadata.cloudy_pixel_percentage,
             S2_Raw_Metadata.epsg,
             S2_Raw_Metadata.sun_azimuth_angle,
             S2_Raw_Metadata.sun_zenith_angle,
             S2_Raw_Metadata.sensor_azimuth_angle,
             S2_Raw_Metadata.sensor_zenith_angle,
         )
-        .filter(S2_Raw_Metadata.tile_id == tile)
-        .filter(
-            and_(
-                S2_Raw_Metadata.sensing_date <= date_end,
-                S2_Raw_Metadata.sensing_date >= date_start,
-            )
-        )
-        .filter(S2_Raw_Metadata.processing_level == processing_level_db)
-        .filter(S2_Raw_Metadata.cloudy_pixel_percentage <= cloud_cover_threshold)
-        .order_by(S2_Raw_Metadata.sensing_date.desc())
+        .filter(and_(*criteria))
         .statement
     )
 
     try:
-        return pd.read_sql(query_statement, session.bind)
+        df = pd.read_sql(query_statement, session.bind)
     except Exception as e:
         raise DataNotFoundError(f"Could not find Sentinel-2 data by tile: {e}")
+    return df.sort_values(
+        "sensing_date", ascending=False, kind="mergesort", ignore_index=True
+    )
+
+
+def summarize_raw_data_by_tile(
+    date_start: date,
+    date_end: date,
+    processing_level: ProcessingLevels,
+    tile: str,
+    cloud_cover_threshold: Optional[Union[int, float]] = 100,
+) -> pd.DataFrame:
+    """
+    Summarizes the Sentinel-2 scenes in the metadata DB matching a tile, time
+    period and processing level (and cloud cover). The summary is computed by
+    the database so that no scene has to be transferred.
+
+    :param date_start:
+        start date of the time period
+    :param date_end:
+        end date of the time period
+    :param processing_level:
+        Sentinel-2 processing level
+    :param tile:
+        Sentinel-2 tile
+    :param cloud_cover_threshold:
+        optional cloud cover threshold to filter datasets by scene cloud coverage.
+        Must be provided as number between 0 and 100%.
+    :returns:
+        single-row dataframe with the number of matching scenes (`n_scenes`)
+        and their mean scene cloud coverage (`cloudy_pixel_percentage`)
+    """
+    criteria = _tile_criteria(
+        date_start, date_end, processing_level, tile, cloud_cover_threshold
+    )
+    summary_statement = select(
+        func.count().label("n_scenes"),
+        func.avg(S2_Raw_Metadata.cloudy_pixel_percentage).label(
+            "cloudy_pixel_percentage"
+        ),
+    ).where(and_(*criteria))
+
+    try:
+        return pd.read_sql(summary_statement, session.bind)
+    except Exception as e:
+        raise DataNotFoundError(f"Could not summarize Sentinel-2 data by tile: {e}")
 
 
 def get_scene_metadata(product_uri: str) -> pd.DataFrame:
@@ -222,3 +309,29 @@ def get_scene_metadata(product_uri: str) -> pd.DataFrame:
         raise DataNotFoundError(
             "Could not find Sentinel-2 scene with product_uri " f"{product_uri}: {e}"
         )
+
+
+def get_existing_product_uris(
+    product_uris: Iterable[str],
+    chunk_size: Optional[int] = 1000,
+) -> Set[str]:
+    """
+    Returns the subset of Sentinel-2 product URIs that are already in the
+    metadata DB. Instead of looking up each scene separately, the product
+    URIs are queried using IN statements of `chunk_size` URIs each.
+
+    :param product_uris:
+        unique product identifiers (.SAFE names of the datasets)
+    :param chunk_size:
+        maximum number of product URIs per query
+    :returns:
+        product URIs found in the metadata DB
+    """
+    product_uris = list(product_uris)
+    existing = set()
+    for idx in range(0, len(product_uris), chunk_size):
+        query = session.query(S2_Raw_Metadata.product_uri).filter(
+            S2_Raw_Metadata.product_uri.in_(product_uris[idx:idx + chunk_size])
+        )
+        existing.update(row.product_uri for row in query)
+    return existing
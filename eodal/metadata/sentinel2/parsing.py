@@ -22,16 +22,22 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import annotations
 
+import hashlib
 import os
-import glob
+import io
+import json
 import time
 import numpy as np
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
-from xml.dom import minidom
+from functools import lru_cache
+from lxml import etree
 from pyproj import Transformer
 from pathlib import Path
 import pandas as pd
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from typing import Tuple, Union
 from datetime import date
 
 from eodal.config import get_settings
@@ -40,10 +46,241 @@ from eodal.utils.exceptions import UnknownProcessingLevel
 from eodal.utils.exceptions import InputError
 from eodal.utils.warnings import NothingToDo
 
-logger = get_settings().logger
+Settings = get_settings()
+logger = Settings.logger
+
+# the metadata xmls do not require entity resolution, ID tables or network
+# access; switching them off hardens the parser and saves parsing time
+_XML_PARSER_OPTIONS = dict(
+    remove_blank_text=True,
+    collect_ids=False,
+    resolve_entities=False,
+    no_network=True,
+    huge_tree=False,
+)
+
+# tags extracted from the MTD_TL.xml. The scene classification statistics
+# are available in L2A processing level, only
+_MTD_TL_PERCENTAGE_TAGS = (
+    "CLOUDY_PIXEL_PERCENTAGE",
+    "DEGRADED_MSI_DATA_PERCENTAGE",
+)
+_MTD_TL_L2A_TAGS = (
+    "NODATA_PIXEL_PERCENTAGE",
+    "DARK_FEATURES_PERCENTAGE",
+    "CLOUD_SHADOW_PERCENTAGE",
+    "VEGETATION_PERCENTAGE",
+    "NOT_VEGETATED_PERCENTAGE",
+    "WATER_PERCENTAGE",
+    "UNCLASSIFIED_PERCENTAGE",
+    "MEDIUM_PROBA_CLOUDS_PERCENTAGE",
+    "HIGH_PROBA_CLOUDS_PERCENTAGE",
+    "THIN_CIRRUS_PERCENTAGE",
+    "SNOW_ICE_PERCENTAGE",
+)
+_MTD_TL_TAGS = (
+    "TILE_ID",
+    "TILE_ID_2A",
+    "L1C_TILE_ID",
+    "SENSING_TIME",
+    "NROWS",
+    "NCOLS",
+    "HORIZONTAL_CS_CODE",
+    "ULX",
+    "ULY",
+    "Mean_Sun_Angle/ZENITH_ANGLE",
+    "Mean_Sun_Angle/AZIMUTH_ANGLE",
+    "Mean_Viewing_Incidence_Angle/ZENITH_ANGLE",
+    "Mean_Viewing_Incidence_Angle/AZIMUTH_ANGLE",
+) + _MTD_TL_PERCENTAGE_TAGS + _MTD_TL_L2A_TAGS
+
+# metadata keys of the per-band entries in the MTD_MSI and MTD_DS xmls
+_SOLAR_IRRADIANCE_KEYS = tuple(
+    f"SOLAR_IRRADIANCE_{band}"
+    for band in (
+        "B01",
+        "B02",
+        "B03",
+        "B04",
+        "B05",
+        "B06",
+        "B07",
+        "B08",
+        "B8A",
+        "B09",
+        "B10",
+        "B11",
+        "B12",
+    )
+)
+_ALPHA_KEYS = tuple(f"alpha_{band}" for band in s2_band_mapping)
+_BETA_KEYS = tuple(f"beta_{band}" for band in s2_band_mapping)
+_PHYSICAL_GAIN_KEYS = tuple(f"physical_gain_{band}" for band in s2_band_mapping)
+
+
+def _collect_tags(
+    in_file: Union[str, Path, bytes],
+    tags: Iterable[str],
+    attributes: Optional[Dict[str, str]] = None,
+) -> Dict[str, List[str]]:
+    """
+    Collects the text of all elements with a tag in ``tags`` in a single
+    linear pass over a metadata xml. Already processed elements are removed
+    from the tree to keep the memory footprint small.
+
+    :param in_file:
+        filepath or content of the metadata xml
+    :param tags:
+        tags of the elements to extract. A tag can be qualified by the tag of
+        its parent element (e.g., "Mean_Sun_Angle/ZENITH_ANGLE") to extract
+        only elements with that parent.
+    :param attributes:
+        optional mapping of tags to attribute names. For these tags the
+        value of the attribute is collected instead of the element text.
+    :returns:
+        dictionary with the extracted values per tag in document order.
+        Tags not found in the xml map to empty lists.
+    """
+    attributes = attributes or {}
+    collected = {tag: [] for tag in tags}
+    leaf_tags = tuple({tag.rsplit("/", 1)[-1] for tag in collected})
+    if isinstance(in_file, bytes):
+        source = io.BytesIO(in_file)
+    else:
+        source = str(in_file)
+    for _, elem in etree.iterparse(
+        source, events=("end",), tag=leaf_tags, **_XML_PARSER_OPTIONS
+    ):
+        key = elem.tag
+        if key not in collected:
+            key = f"{elem.getparent().tag}/{elem.tag}"
+        if key in attributes:
+            collected[key].append(elem.get(attributes[key]))
+        elif key in collected:
+            collected[key].append(elem.text)
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+    return collected
+
+
+def _append_record(
+    columns: Dict[str, List[Any]], record: Dict[str, Any], n_records: int
+) -> None:
+    """
+    Appends a metadata record to a column-oriented dictionary of lists.
+    Columns not present in the record are filled with NaN.
+
+    :param columns:
+        dictionary of lists (one list per column) to append the record to
+    :param record:
+        metadata record to append
+    :param n_records:
+        number of records already appended to ``columns``
+    """
+    for key, value in record.items():
+        if key not in columns:
+            columns[key] = [np.nan] * n_records
+        columns[key].append(value)
+    for key in columns.keys() - record.keys():
+        columns[key].append(np.nan)
+
+
+# version of the parser outputs. Must be increased whenever the output of
+# the metadata xml parsers changes to invalidate cached outputs
+_MTD_CACHE_VERSION = 1
+
+
+def _to_json(value: Any) -> Dict[str, str]:
+    """encodes the dates in parser outputs for storing them as JSON"""
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    raise TypeError(f"Cannot serialize {type(value)}")
 
 
-def parse_MTD_DS(in_file: Path) -> Dict[str, Any]:
+def _from_json(value: Dict[str, Any]) -> Any:
+    """decodes the dates in parser outputs stored as JSON"""
+    if "__date__" in value:
+        return date.fromisoformat(value["__date__"])
+    return value
+
+
+def _prune_mtd_cache(cache_dir: Path, max_age: int) -> None:
+    """
+    Removes cached parser outputs not used for more than `max_age` days.
+
+    :param cache_dir:
+        directory with the cached parser outputs
+    :param max_age:
+        maximum age of the cache entries in days
+    """
+    oldest = time.time() - max_age * 86400
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.stat().st_mtime < oldest:
+                    os.remove(entry.path)
+    except OSError as e:
+        logger.debug(f"Could not prune metadata cache {cache_dir}: {e}")
+
+
+def _parse_cached(
+    parser: Callable[[Union[Path, bytes]], Dict[str, Any]],
+    mtd_file: Path,
+    content: Optional[bytes] = None,
+    cache_dir: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """
+    Calls a metadata xml parser and memoizes its output on disk as JSON. The
+    cache entries are keyed by the parser, the version of the parser outputs
+    and the path, modification time and size of the xml.
+
+    :param parser:
+        parser function to call
+    :param mtd_file:
+        filepath of the metadata xml
+    :param content:
+        optional content of the metadata xml if already read
+    :param cache_dir:
+        directory for storing the cached parser outputs. If None (default)
+        no caching takes place.
+    :returns:
+        output of the parser
+    """
+    in_file = mtd_file if content is None else content
+    if cache_dir is None:
+        return parser(in_file)
+
+    stat = mtd_file.stat()
+    key = (
+        f"{parser.__name__}:{_MTD_CACHE_VERSION}:{mtd_file.resolve()}:"
+        f"{stat.st_mtime_ns}:{stat.st_size}"
+    )
+    cache_file = cache_dir.joinpath(f"{hashlib.sha1(key.encode()).hexdigest()}.json")
+    try:
+        with open(cache_file, "r") as src:
+            metadata = json.load(src, object_hook=_from_json)
+        # mark the entry as used so that it is not pruned
+        os.utime(cache_file)
+        return metadata
+    except (OSError, ValueError):
+        pass
+
+    metadata = parser(in_file)
+    # write to a temporary file first to avoid that other processes read
+    # incomplete cache entries. Failures are ignored
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "w") as dst:
+            json.dump(metadata, dst, default=_to_json)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.debug(f"Could not cache metadata of {mtd_file}: {e}")
+    return metadata
+
+
+def parse_MTD_DS(in_file: Union[Path, bytes]) -> Dict[str, Any]:
     """
     Parses the MTD_DS.xml located in tghe /DATASTRIP folder
     in each .SAFE dataset. The xml contains the noise model parameters
@@ -53,43 +290,36 @@ def parse_MTD_DS(in_file: Path) -> Dict[str, Any]:
     optional.
 
     :param in_file:
-        filepath of the scene metadata xml (MTD_DS.xml)
+        filepath or content of the scene metadata xml (MTD_DS.xml)
     :return metadata:
         dictionary with extracted noise model parameters, alpha
         and beta, per spectral band of MSI
     """
-    # parse the xml file into a minidom object
-    xmldoc = minidom.parse(str(in_file))
+    # extract the values of the relevant tags in a single pass
+    xml = _collect_tags(
+        in_file,
+        tags=("Datatake_Info", "ALPHA", "BETA", "PHYSICAL_GAINS"),
+        attributes={"Datatake_Info": "datatakeIdentifier"},
+    )
 
     # now, the values of some relevant tags can be extracted:
     metadata = dict()
-    band_names = list(s2_band_mapping.keys())
-
-    datatakeIdentifier_xml = xmldoc.getElementsByTagName("Datatake_Info")
-    element = datatakeIdentifier_xml[0]
-    datatakeIdentifier = element.getAttribute("datatakeIdentifier")
-    metadata["datatakeidentifier"] = datatakeIdentifier
+    metadata["datatakeidentifier"] = xml["Datatake_Info"][0]
 
     # extract noise model parameters alpha and beta for all bands
-    alpha_values = xmldoc.getElementsByTagName("ALPHA")
-    beta_values = xmldoc.getElementsByTagName("BETA")
-    # loop over bands and store values of alpha and beta
-    for idx, elem in enumerate(zip(alpha_values, beta_values)):
-        alpha = float(elem[0].firstChild.nodeValue)
-        beta = float(elem[1].firstChild.nodeValue)
-        metadata[f"alpha_{band_names[idx]}"] = alpha
-        metadata[f"beta_{band_names[idx]}"] = beta
+    alpha_values = np.fromiter(xml["ALPHA"], dtype=np.float64)
+    beta_values = np.fromiter(xml["BETA"], dtype=np.float64)
+    metadata.update(zip(_ALPHA_KEYS, alpha_values.tolist()))
+    metadata.update(zip(_BETA_KEYS, beta_values.tolist()))
 
     # extract physical gans of the single spectral bands
-    physical_gains = xmldoc.getElementsByTagName("PHYSICAL_GAINS")
-    for idx, elem in enumerate(physical_gains):
-        physical_gain = float(elem.firstChild.nodeValue)
-        metadata[f"physical_gain_{band_names[idx]}"] = physical_gain
+    physical_gains = np.fromiter(xml["PHYSICAL_GAINS"], dtype=np.float64)
+    metadata.update(zip(_PHYSICAL_GAIN_KEYS, physical_gains.tolist()))
 
     return metadata
 
 
-def parse_MTD_TL(in_file: Path) -> Dict[str, Any]:
+def parse_MTD_TL(in_file: Union[Path, bytes]) -> Dict[str, Any]:
     """
     Parses the MTD_TL.xml metadata file provided by ESA.This metadata
     XML is usually placed in the GRANULE subfolder of a ESA-derived
@@ -104,24 +334,24 @@ def parse_MTD_TL(in_file: Path) -> Dict[str, Any]:
     returns a dict with those extracted entries.
 
     :param in_file:
-        filepath of the scene metadata xml 8MTD_TL.xml)
+        filepath or content of the scene metadata xml (MTD_TL.xml)
     :return metadata:
         dict with extracted metadata entries
     """
-    # parse the xml file into a minidom object
-    xmldoc = minidom.parse(in_file)
+    # extract the values of the relevant tags in a single pass
+    xml = _collect_tags(in_file, tags=_MTD_TL_TAGS)
 
     # now, the values of some relevant tags can be extracted:
     metadata = dict()
 
     # get tile ID of L2A product and its corresponding L1C counterpart
-    tile_id_xml = xmldoc.getElementsByTagName("TILE_ID")
+    tile_id_xml = xml["TILE_ID"]
     # adaption to older Sen2Cor version
     check_l1c = True
     if len(tile_id_xml) == 0:
-        tile_id_xml = xmldoc.getElementsByTagName("TILE_ID_2A")
+        tile_id_xml = xml["TILE_ID_2A"]
         check_l1c = False
-    tile_id = tile_id_xml[0].firstChild.nodeValue
+    tile_id = tile_id_xml[0]
     scene_id = tile_id.split(".")[0]
     metadata["SCENE_ID"] = scene_id
 
@@ -129,8 +359,7 @@ def parse_MTD_TL(in_file: Path) -> Dict[str, Any]:
     is_l1c = False
     if check_l1c:
         try:
-            l1c_tile_id_xml = xmldoc.getElementsByTagName("L1C_TILE_ID")
-            l1c_tile_id = l1c_tile_id_xml[0].firstChild.nodeValue
+            l1c_tile_id = xml["L1C_TILE_ID"][0]
             l1c_tile_id = l1c_tile_id.split(".")[0]
             metadata["L1C_TILE_ID"] = l1c_tile_id
         except Exception:
@@ -138,107 +367,48 @@ def parse_MTD_TL(in_file: Path) -> Dict[str, Any]:
             is_l1c = True
 
     # sensing time (acquisition time)
-    sensing_time_xml = xmldoc.getElementsByTagName("SENSING_TIME")
-    sensing_time = sensing_time_xml[0].firstChild.nodeValue
+    sensing_time = xml["SENSING_TIME"][0]
     metadata["SENSING_TIME"] = sensing_time
-    metadata["SENSING_DATE"] = datetime.strptime(
-        sensing_time.split("T")[0], "%Y-%m-%d"
-    ).date()
+    metadata["SENSING_DATE"] = date.fromisoformat(sensing_time[:10])
 
     # number of rows and columns for each resolution -> 10, 20, 60 meters
-    nrows_xml = xmldoc.getElementsByTagName("NROWS")
-    ncols_xml = xmldoc.getElementsByTagName("NCOLS")
+    nrows_xml = xml["NROWS"]
+    ncols_xml = xml["NCOLS"]
     resolutions = ["_10m", "_20m", "_60m"]
     # order: 10, 20, 60 meters spatial resolution
     for ii in range(3):
-        nrows = nrows_xml[ii].firstChild.nodeValue
-        ncols = ncols_xml[ii].firstChild.nodeValue
+        nrows = nrows_xml[ii]
+        ncols = ncols_xml[ii]
         metadata["NROWS" + resolutions[ii]] = int(nrows)
         metadata["NCOLS" + resolutions[ii]] = int(ncols)
 
     # EPSG-code
-    epsg_xml = xmldoc.getElementsByTagName("HORIZONTAL_CS_CODE")
-    epsg = epsg_xml[0].firstChild.nodeValue
+    epsg = xml["HORIZONTAL_CS_CODE"][0]
     metadata["EPSG"] = int(epsg.split(":")[1])
 
     # Upper Left Corner coordinates -> is the same for all three resolutions
-    ulx_xml = xmldoc.getElementsByTagName("ULX")
-    uly_xml = xmldoc.getElementsByTagName("ULY")
-    ulx = ulx_xml[0].firstChild.nodeValue
-    uly = uly_xml[0].firstChild.nodeValue
-    metadata["ULX"] = float(ulx)
-    metadata["ULY"] = float(uly)
-    # endfor
-
-    # extract the mean zenith and azimuth angles
-    # the sun angles come first followed by the mean angles per band
-    zenith_angles = xmldoc.getElementsByTagName("ZENITH_ANGLE")
-    metadata["SUN_ZENITH_ANGLE"] = float(zenith_angles[0].firstChild.nodeValue)
-
-    azimuth_angles = xmldoc.getElementsByTagName("AZIMUTH_ANGLE")
-    metadata["SUN_AZIMUTH_ANGLE"] = float(azimuth_angles[0].firstChild.nodeValue)
+    metadata["ULX"] = float(xml["ULX"][0])
+    metadata["ULY"] = float(xml["ULY"][0])
 
-    # get the mean zenith and azimuth angle over all bands
-    sensor_zenith_angles = [float(x.firstChild.nodeValue) for x in zenith_angles[1::]]
-    metadata["SENSOR_ZENITH_ANGLE"] = np.mean(np.asarray(sensor_zenith_angles))
+    # extract the mean sun zenith and azimuth angles
+    metadata["SUN_ZENITH_ANGLE"] = float(xml["Mean_Sun_Angle/ZENITH_ANGLE"][0])
+    metadata["SUN_AZIMUTH_ANGLE"] = float(xml["Mean_Sun_Angle/AZIMUTH_ANGLE"][0])
 
-    sensor_azimuth_angles = [float(x.firstChild.nodeValue) for x in azimuth_angles[1::]]
-    metadata["SENSOR_AZIMUTH_ANGLE"] = np.mean(np.asarray(sensor_azimuth_angles))
+    # get the mean zenith and azimuth angle over all bands
+    metadata["SENSOR_ZENITH_ANGLE"] = np.array(
+        xml["Mean_Viewing_Incidence_Angle/ZENITH_ANGLE"], dtype=np.float64
+    ).mean()
+    metadata["SENSOR_AZIMUTH_ANGLE"] = np.array(
+        xml["Mean_Viewing_Incidence_Angle/AZIMUTH_ANGLE"], dtype=np.float64
+    ).mean()
 
     # extract scene relevant data about nodata values, cloud coverage, etc.
-    cloudy_xml = xmldoc.getElementsByTagName("CLOUDY_PIXEL_PERCENTAGE")
-    cloudy = cloudy_xml[0].firstChild.nodeValue
-    metadata["CLOUDY_PIXEL_PERCENTAGE"] = float(cloudy)
-
-    degraded_xml = xmldoc.getElementsByTagName("DEGRADED_MSI_DATA_PERCENTAGE")
-    degraded = degraded_xml[0].firstChild.nodeValue
-    metadata["DEGRADED_MSI_DATA_PERCENTAGE"] = float(degraded)
-
     # the other tags are available in L2A processing level, only
+    percentage_tags = _MTD_TL_PERCENTAGE_TAGS
     if not is_l1c:
-        nodata_xml = xmldoc.getElementsByTagName("NODATA_PIXEL_PERCENTAGE")
-        nodata = nodata_xml[0].firstChild.nodeValue
-        metadata["NODATA_PIXEL_PERCENTAGE"] = float(nodata)
-
-        darkfeatures_xml = xmldoc.getElementsByTagName("DARK_FEATURES_PERCENTAGE")
-        darkfeatures = darkfeatures_xml[0].firstChild.nodeValue
-        metadata["DARK_FEATURES_PERCENTAGE"] = float(darkfeatures)
-
-        cs_xml = xmldoc.getElementsByTagName("CLOUD_SHADOW_PERCENTAGE")
-        cs = cs_xml[0].firstChild.nodeValue
-        metadata["CLOUD_SHADOW_PERCENTAGE"] = float(cs)
-
-        veg_xml = xmldoc.getElementsByTagName("VEGETATION_PERCENTAGE")
-        veg = veg_xml[0].firstChild.nodeValue
-        metadata["VEGETATION_PERCENTAGE"] = float(veg)
-
-        noveg_xml = xmldoc.getElementsByTagName("NOT_VEGETATED_PERCENTAGE")
-        noveg = noveg_xml[0].firstChild.nodeValue
-        metadata["NOT_VEGETATED_PERCENTAGE"] = float(noveg)
-
-        water_xml = xmldoc.getElementsByTagName("WATER_PERCENTAGE")
-        water = water_xml[0].firstChild.nodeValue
-        metadata["WATER_PERCENTAGE"] = float(water)
-
-        unclass_xml = xmldoc.getElementsByTagName("UNCLASSIFIED_PERCENTAGE")
-        unclass = unclass_xml[0].firstChild.nodeValue
-        metadata["UNCLASSIFIED_PERCENTAGE"] = float(unclass)
-
-        cproba_xml = xmldoc.getElementsByTagName("MEDIUM_PROBA_CLOUDS_PERCENTAGE")
-        cproba = cproba_xml[0].firstChild.nodeValue
-        metadata["MEDIUM_PROBA_CLOUDS_PERCENTAGE"] = float(cproba)
-
-        hcproba_xml = xmldoc.getElementsByTagName("HIGH_PROBA_CLOUDS_PERCENTAGE")
-        hcproba = hcproba_xml[0].firstChild.nodeValue
-        metadata["HIGH_PROBA_CLOUDS_PERCENTAGE"] = float(hcproba)
-
-        thcirrus_xml = xmldoc.getElementsByTagName("THIN_CIRRUS_PERCENTAGE")
-        thcirrus = thcirrus_xml[0].firstChild.nodeValue
-        metadata["THIN_CIRRUS_PERCENTAGE"] = float(thcirrus)
-
-        snowice_xml = xmldoc.getElementsByTagName("SNOW_ICE_PERCENTAGE")
-        snowice = snowice_xml[0].firstChild.nodeValue
-        metadata["SNOW_ICE_PERCENTAGE"] = float(snowice)
+        percentage_tags += _MTD_TL_L2A_TAGS
+    percentages = np.array([xml[tag][0] for tag in percentage_tags], dtype=np.float64)
+    metadata.update(zip(percentage_tags, percentages.tolist()))
 
     # calculate the scene footprint in geographic coordinates
     metadata["geom"] = get_scene_footprint(sensor_data=metadata)
@@ -246,7 +416,7 @@ def parse_MTD_TL(in_file: Path) -> Dict[str, Any]:
     return metadata
 
 
-def parse_MTD_MSI(in_file: str) -> Dict[str, Any]:
+def parse_MTD_MSI(in_file: Union[str, bytes]) -> Dict[str, Any]:
     """
     parses the MTD_MSIL1C or MTD_MSIL2A metadata file that is delivered with
     ESA Sentinel-2 L1C and L2A products, respectively.
@@ -257,22 +427,36 @@ def parse_MTD_MSI(in_file: str) -> Dict[str, Any]:
     The extracted metadata is returned as a dict.
 
     :param in_file:
-        filepath of the scene metadata xml (MTD_MSI2A.xml or MTD_MSIL1C.xml)
+        filepath or content of the scene metadata xml (MTD_MSI2A.xml or
+        MTD_MSIL1C.xml)
     """
-    # parse the xml file into a minidom object
-    xmldoc = minidom.parse(in_file)
+    # extract the values of the relevant tags in a single pass
+    xml = _collect_tags(
+        in_file,
+        tags=(
+            "L2A_Product_Info",
+            "PRODUCT_URI",
+            "PRODUCT_URI_2A",
+            "PROCESSING_LEVEL",
+            "SENSING_ORBIT_NUMBER",
+            "SPACECRAFT_NAME",
+            "SENSING_ORBIT_DIRECTION",
+            "Datatake",
+            "U",
+            "SOLAR_IRRADIANCE",
+        ),
+        attributes={"Datatake": "datatakeIdentifier"},
+    )
 
     # check the version of the xml. Unfortunately, different sen2cor version
     # also produced slightly different metadata xmls
-    if xmldoc.getElementsByTagName("L2A_Product_Info"):
+    if xml["L2A_Product_Info"]:
         tag_list = ["PRODUCT_URI_2A"]
     else:
         tag_list = ["PRODUCT_URI"]
 
     # datatake identifier
-    datatakeIdentifier_xml = xmldoc.getElementsByTagName("Datatake")
-    element = datatakeIdentifier_xml[0]
-    datatakeIdentifier = element.getAttribute("datatakeIdentifier")
+    datatakeIdentifier = xml["Datatake"][0]
 
     # define further tags to extract
     tag_list.extend(
@@ -287,12 +471,11 @@ def parse_MTD_MSI(in_file: str) -> Dict[str, Any]:
     metadata = dict.fromkeys(tag_list)
 
     for tag in tag_list:
-        xml_elem = xmldoc.getElementsByTagName(tag)
         if tag == "PRODUCT_URI_2A":
-            metadata["PRODUCT_URI"] = xml_elem[0].firstChild.data
+            metadata["PRODUCT_URI"] = xml[tag][0]
             metadata.pop("PRODUCT_URI_2A")
         else:
-            metadata[tag] = xml_elem[0].firstChild.data
+            metadata[tag] = xml[tag][0]
 
     metadata["datatakeIdentifier"] = datatakeIdentifier
 
@@ -304,31 +487,15 @@ def parse_MTD_MSI(in_file: str) -> Dict[str, Any]:
         metadata["PROCESSING_LEVEL"] = "Level-2A"
 
     # reflectance conversion factor (U)
-    reflectance_conversion_xml = xmldoc.getElementsByTagName("U")
-    reflectance_conversion = float(reflectance_conversion_xml[0].firstChild.nodeValue)
-    metadata["reflectance_conversion"] = reflectance_conversion
+    metadata["reflectance_conversion"] = float(xml["U"][0])
 
     # extract solar irradiance for the single bands
-    bands = [
-        "B01",
-        "B02",
-        "B03",
-        "B04",
-        "B05",
-        "B06",
-        "B07",
-        "B08",
-        "B8A",
-        "B09",
-        "B10",
-        "B11",
-        "B12",
-    ]
-    sol_irrad_xml = xmldoc.getElementsByTagName("SOLAR_IRRADIANCE")
-    for idx, band in enumerate(bands):
-        metadata[f"SOLAR_IRRADIANCE_{band}"] = float(
-            sol_irrad_xml[idx].firstChild.nodeValue
-        )
+    sol_irrad = np.fromiter(
+        xml["SOLAR_IRRADIANCE"],
+        dtype=np.float64,
+        count=len(_SOLAR_IRRADIANCE_KEYS),
+    )
+    metadata.update(zip(_SOLAR_IRRADIANCE_KEYS, sol_irrad.tolist()))
 
     # S2 tile
     metadata["TILE_ID"] = metadata["PRODUCT_URI"].split("_")[5]
@@ -336,6 +503,20 @@ def parse_MTD_MSI(in_file: str) -> Dict[str, Any]:
     return metadata
 
 
+@lru_cache(maxsize=64)
+def _get_transformer(epsg: int) -> Transformer:
+    """
+    Returns a (cached) transformer from a UTM zone into WGS84 geographic
+    coordinates (longitude, latitude).
+
+    :param epsg:
+        EPSG code of the source UTM zone
+    :returns:
+        ``Transformer`` instance
+    """
+    return Transformer.from_crs(f"epsg:{epsg}", "epsg:4326", always_xy=True)
+
+
 def get_scene_footprint(sensor_data: dict) -> str:
     """
     get the footprint (geometry) of a scene by calculating its
@@ -351,10 +532,8 @@ def get_scene_footprint(sensor_data: dict) -> str:
         extended well-known-text representation of the scene
         footprint
     """
-    dst_crs = "epsg:4326"
     # get the EPSG-code
     epsg = sensor_data["EPSG"]
-    src_crs = f"epsg:{epsg}"
     # the pixelsize is set to 10 m
     pixelsize = 10.0
 
@@ -372,12 +551,12 @@ def get_scene_footprint(sensor_data: dict) -> str:
     lrx = urx  # lower right x
     lry = lly  # lower right y
 
-    # transform coordinates to WGS84
-    transformer = Transformer.from_crs(src_crs, dst_crs)
-    uly, ulx = transformer.transform(xx=ulx, yy=uly)
-    ury, urx = transformer.transform(xx=urx, yy=ury)
-    lly, llx = transformer.transform(xx=llx, yy=lly)
-    lry, lrx = transformer.transform(xx=lrx, yy=lry)
+    # transform the corner coordinates to WGS84 in a single call
+    lons, lats = _get_transformer(epsg).transform(
+        np.array([ulx, urx, lrx, llx]), np.array([uly, ury, lry, lly])
+    )
+    ulx, urx, lrx, llx = lons
+    uly, ury, lry, lly = lats
 
     wkt = "SRID=4326;"
     wkt += f"POLYGON(({ulx} {uly},{urx} {ury},{lrx} {lry},{llx} {lly},{ulx} {uly}))"
@@ -386,7 +565,9 @@ def get_scene_footprint(sensor_data: dict) -> str:
 
 
 def parse_s2_scene_metadata(
-    in_dir: Path, extract_datastrip: Optional[bool] = False
+    in_dir: Path,
+    extract_datastrip: Optional[bool] = False,
+    cache_dir: Optional[Path] = None,
 ) -> Tuple[Dict[str, Any]]:
     """
     wrapper function to extract metadata from ESA Sentinel-2
@@ -411,6 +592,9 @@ def parse_s2_scene_metadata(
     :param extract_datastrip:
         If True reads also metadata from the datastrip xml file
         (MTD_DS.xml)
+    :param cache_dir:
+        optional directory for caching the parsed metadata xmls. If None
+        (default) the xmls are always parsed.
     :return mtd_msi:
         dict with extracted metadata items
     """
@@ -418,34 +602,41 @@ def parse_s2_scene_metadata(
     # depending on the processing level (supported: L1C and
     # L2A) metadata has to be extracted slightly differently
     # because of different file names and storage locations
+    # locate all metadata xmls in a single traversal of the .SAFE tree. The
+    # xmls are read once; their content is parsed and stored as text
+    mtd_files = {}
+    for mtd_file in Path(in_dir).rglob("MTD_*.xml"):
+        mtd_files.setdefault(mtd_file.name, mtd_file)
+
     if str(in_dir).find("_MSIL2A_") > 0:
         # scene is L2A
-        mtd_msil2a_xml = str(next(Path(in_dir).rglob("MTD_MSIL2A.xml")))
-        mtd_msi = parse_MTD_MSI(in_file=mtd_msil2a_xml)
-        with open(mtd_msil2a_xml, "r") as xml_file:
-            mtd_msi["mtd_msi_xml"] = xml_file.read().strip()
-
+        mtd_msi_file = mtd_files["MTD_MSIL2A.xml"]
     elif str(in_dir).find("_MSIL1C_") > 0:
         # scene is L1C
-        mtd_msil1c_xml = str(next(Path(in_dir).rglob("MTD_MSIL1C.xml")))
-        mtd_msi = parse_MTD_MSI(in_file=mtd_msil1c_xml)
-        with open(mtd_msil1c_xml, "r") as xml_file:
-            mtd_msi["mtd_msi_xml"] = xml_file.read().strip()
-
+        mtd_msi_file = mtd_files["MTD_MSIL1C.xml"]
     else:
         raise UnknownProcessingLevel(f"{in_dir} seems not be a valid Sentinel-2 scene")
 
-    mtd_tl_xml = str(next(Path(in_dir).rglob("MTD_TL.xml")))
-    with open(mtd_tl_xml) as xml_file:
-        mtd_msi["mtd_tl_xml"] = xml_file.read().strip()
+    mtd_tl_file = mtd_files["MTD_TL.xml"]
+    mtd_msi_xml = mtd_msi_file.read_bytes()
+    mtd_tl_xml = mtd_tl_file.read_bytes()
+
+    # the xmls are small and parsed one after the other (scenes are
+    # already distributed across worker processes)
+    mtd_msi = _parse_cached(parse_MTD_MSI, mtd_msi_file, mtd_msi_xml, cache_dir)
+    mtd_tl = _parse_cached(parse_MTD_TL, mtd_tl_file, mtd_tl_xml, cache_dir)
+
+    mtd_msi["mtd_msi_xml"] = mtd_msi_xml.decode().strip()
+    mtd_msi["mtd_tl_xml"] = mtd_tl_xml.decode().strip()
 
     # datastrip xml (optional)
     mtd_ds = {}
     if extract_datastrip:
-        mtd_ds_xml = str(next(Path(in_dir).rglob("MTD_DS.xml")))
-        mtd_ds = parse_MTD_DS(in_file=mtd_ds_xml)
+        mtd_ds = _parse_cached(
+            parse_MTD_DS, mtd_files["MTD_DS.xml"], cache_dir=cache_dir
+        )
 
-    mtd_msi.update(parse_MTD_TL(in_file=mtd_tl_xml))
+    mtd_msi.update(mtd_tl)
 
     # storage location and path handling
     storage_path = in_dir.parent.as_posix()
@@ -456,11 +647,50 @@ def parse_s2_scene_metadata(
     return mtd_msi, mtd_ds
 
 
+def _iter_scene_metadata(
+    s2_scenes: List[str],
+    extract_datastrip: Optional[bool] = False,
+    max_workers: Optional[int] = None,
+    cache_dir: Optional[Path] = None,
+) -> Iterator[Tuple[str, Future]]:
+    """
+    Extracts the metadata of Sentinel-2 mapper in worker processes and yields
+    the mapper and the futures holding their metadata in the order of the
+    mapper. Only a limited number of mapper is submitted ahead of the consumer
+    so that the parsed metadata does not pile up in memory.
+
+    :param s2_scenes:
+        list of Sentinel-2 mapper (.SAFE directories)
+    :param extract_datastrip:
+        If True reads also metadata from the datastrip xml file
+        (MTD_DS.xml)
+    :param max_workers:
+        number of worker processes. Defaults to the number of CPUs.
+    :param cache_dir:
+        optional directory for caching the parsed metadata xmls
+    :returns:
+        iterator over tuples of mapper and futures
+    """
+    n_ahead = 2 * (max_workers or os.cpu_count() or 1)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for s2_scene in s2_scenes:
+            future = executor.submit(
+                parse_s2_scene_metadata, Path(s2_scene), extract_datastrip, cache_dir
+            )
+            pending.append((s2_scene, future))
+            if len(pending) >= n_ahead:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+
+
 def loop_s2_archive(
     in_dir: Path,
     extract_datastrip: Optional[bool] = False,
     get_newest_datasets: Optional[bool] = False,
     last_execution_date: Optional[date] = None,
+    max_workers: Optional[int] = None,
 ) -> Tuple[pd.DataFrame]:
     """
     wrapper function to loop over an entire archive (i.e., collection) of
@@ -486,6 +716,9 @@ def loop_s2_archive(
         if get_newest_datasets is True this variable needs to be set. All
         datasets younger than that date will be considered for ingestion
         into the database.
+    :param max_workers:
+        number of worker processes used for extracting the metadata of the
+        mapper in parallel. Defaults to the number of CPUs of the machine.
     :return:
         dataframe with metadata of all mapper handled by the function
         call
@@ -499,57 +732,82 @@ def loop_s2_archive(
                 "datasets shall be considered"
             )
 
-    # search for .SAFE subdirectories identifying the single mapper
-    # some data providers, however, do not name their products following the
-    # ESA convention (.SAFE is missing)
-    s2_scenes = glob.glob(str(in_dir.joinpath("*.SAFE")))
-    n_scenes = len(s2_scenes)
-
-    if n_scenes == 0:
-        s2_scenes = [f for f in in_dir.iterdir() if f.is_dir()]
-        n_scenes = len(s2_scenes)
-        if n_scenes == 0:
+    # search for .SAFE subdirectories identifying the single mapper in a single
+    # pass over the directory. Some data providers, however, do not name their
+    # products following the ESA convention (.SAFE is missing). Therefore, all
+    # subdirectories are kept as fallback (hidden ones, e.g., the metadata
+    # cache, are skipped)
+    with os.scandir(in_dir) as it:
+        entries = [
+            e
+            for e in it
+            if not e.name.startswith(".") and (e.name.endswith(".SAFE") or e.is_dir())
+        ]
+    s2_entries = [e for e in entries if e.name.endswith(".SAFE")]
+    if len(s2_entries) == 0:
+        s2_entries = entries
+        if len(s2_entries) == 0:
             raise UnknownProcessingLevel("No Sentinel-2 mapper were found")
 
     # if only mapper after a specific timestamp shall be considered drop
-    # those from the list which are "too old"
+    # those from the list which are "too old" (the DirEntry caches the
+    # result of stat)
     if get_newest_datasets:
-        filtered_scenes = []
         # convert date to Unix timestamp
         last_execution = time.mktime(last_execution_date.timetuple())
-        for s2_scene in s2_scenes:
-            s2_scene_path = Path(s2_scene)
-            if s2_scene_path.stat().st_ctime >= last_execution:
-                filtered_scenes.append(s2_scene)
-        s2_scenes = filtered_scenes
-        if len(s2_scenes) == 0:
+        s2_entries = [e for e in s2_entries if e.stat().st_ctime >= last_execution]
+        if len(s2_entries) == 0:
             raise NothingToDo(
                 'No mapper younger than ' +
                 f'{datetime.strftime(last_execution_date, "%Y-%m-%d")} found'
             )
+    s2_scenes = [e.path for e in s2_entries]
+    n_scenes = len(s2_scenes)
 
     # loop over the mapper
-    metadata_scenes = []
-    ql_ds_scenes = []
-    error_file = open(in_dir.joinpath("errored_datasets.txt"), "w+")
-    for idx, s2_scene in enumerate(s2_scenes):
+    # the metadata is stored column-wise to speed up the DataFrame construction
+    metadata_scenes = {}
+    ql_ds_scenes = {}
+    n_parsed = 0
+    errored_datasets = []
+    # the mapper are parsed in parallel, logging and error handling is done
+    # in the main process in the order the mapper were found
+    # parsed metadata xmls are cached in the user's cache directory if enabled
+    cache_dir = None
+    if Settings.S2_MTD_CACHE:
+        cache_dir = Path(Settings.S2_MTD_CACHE_DIR)
+        _prune_mtd_cache(cache_dir, max_age=Settings.S2_MTD_CACHE_MAX_AGE)
+    scene_iter = _iter_scene_metadata(
+        s2_scenes,
+        extract_datastrip=extract_datastrip,
+        max_workers=max_workers,
+        cache_dir=cache_dir,
+    )
+    for idx, (s2_scene, future) in enumerate(scene_iter):
         logger.info(
-            f"Extracting metadata of {os.path.basename(s2_scene)} ({idx+1}/{n_scenes})"
+            f"Extracting metadata of {os.path.basename(s2_scene)} "
+            f"({idx+1}/{n_scenes})"
         )
         try:
-            mtd_scene, mtd_ds_scene = parse_s2_scene_metadata(
-                in_dir=Path(s2_scene), extract_datastrip=extract_datastrip
-            )
+            mtd_scene, mtd_ds_scene = future.result()
         except Exception as e:
-            error_file.write(Path(s2_scene).name)
-            error_file.flush()
+            errored_datasets.append(os.path.basename(s2_scene))
             logger.error(f"Extraction of metadata failed {s2_scene}: {e}")
             continue
-        metadata_scenes.append(mtd_scene)
-        ql_ds_scenes.append(mtd_ds_scene)
+        _append_record(metadata_scenes, mtd_scene, n_parsed)
+        _append_record(ql_ds_scenes, mtd_ds_scene, n_parsed)
+        n_parsed += 1
+
+    # write the names of the datasets that could not be parsed at once. The
+    # file is only written if there are any (a stale one is removed)
+    errored_file = in_dir.joinpath("errored_datasets.txt")
+    if errored_datasets:
+        errored_file.write_text("\n".join(errored_datasets))
+    else:
+        errored_file.unlink(missing_ok=True)
 
     # convert to pandas dataframe and return
     return (
-        pd.DataFrame.from_dict(metadata_scenes),
-        pd.DataFrame.from_dict(ql_ds_scenes),
+        pd.DataFrame(metadata_scenes, index=pd.RangeIndex(n_parsed)),
+        pd.DataFrame(ql_ds_scenes, index=pd.RangeIndex(n_parsed)),
     )
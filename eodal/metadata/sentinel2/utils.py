@@ -19,6 +19,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 from typing import Optional, Tuple
 
@@ -45,23 +46,24 @@ def identify_updated_scenes(
         tuple item.
     """
 
-    # get a copy of the input to work with
-    metadata = metadata_df.copy()
-
     # check product uri and extract the processing baseline
-    metadata["baseline"] = metadata.product_uri.apply(
-        lambda x: int(x.split("_")[3][1:4])
-    )
+    baseline = (
+        metadata_df.product_uri.str.split("_").str[3].str[1:4].astype("int16")
+    ).to_numpy()
 
     # get either the highest baseline version or the baseline most datasets
     # belong to depending on the user input
     if return_highest_baseline:
-        baseline_sel = metadata.baseline.unique().max()
+        baseline_sel = baseline.max()
     else:
-        baseline_sel = metadata.baseline.mode()
+        # baselines are bounded, non-negative integers -> counting them is O(N)
+        # and avoids the sort pandas' mode() requires
+        baseline_sel = np.bincount(baseline).argmax()
 
     # return only those data-set belonging to the selected baseline version
+    # (the input is not copied, the baseline is added to the returned slices)
+    mask = baseline == baseline_sel
     return (
-        metadata[metadata.baseline == baseline_sel],
-        metadata[metadata.baseline != baseline_sel],
+        metadata_df.loc[mask].assign(baseline=baseline[mask]),
+        metadata_df.loc[~mask].assign(baseline=baseline[~mask]),
     )
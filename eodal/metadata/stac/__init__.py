@@ -1 +1,3 @@
-from .client import query_stac, sentinel1, sentinel2, landsat
+from .client import (
+    iter_stac, query_stac, query_stac_batch, sentinel1, sentinel2, landsat
+)
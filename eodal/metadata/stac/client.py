@@ -5,24 +5,487 @@ Querying datasets from a Spatio-Temporal Asset Catalog (STAC).
 from __future__ import annotations
 
 import geopandas as gpd
+import gzip
+import hashlib
+import json
+import numpy as np
+import os
 import pandas as pd
+import queue
+import shapely
+import shapely.geometry
+import threading
+import time
 import warnings
 
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
 from pystac_client import Client
 from pystac_client.stac_api_io import StacApiIO
 from requests.adapters import HTTPAdapter, Retry
-from shapely.geometry import box, Polygon
-from typing import Any, Dict, List
+from shapely.geometry import Polygon
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from eodal.config import get_settings, STAC_Providers
 from eodal.mapper.filter import Filter
 from eodal.utils.decorators import prepare_bbox
-from eodal.utils.geometry import box_from_transform, prepare_gdf
-from eodal.utils.reprojection import infer_utm_zone
-from eodal.utils.timestamps import datetime_to_date
+from eodal.utils.geometry import (
+    boxes_from_transforms,
+    polygons_from_rings,
+    prepare_gdf,
+)
+from eodal.utils.reprojection import infer_utm_zones
+
+# orjson (optional) speeds up (de)serializing the cached STAC responses.
+# pystac uses it for parsing the responses of the STAC server, too
+try:
+    import orjson
+except ModuleNotFoundError:
+    orjson = None
+
+# requests-cache (optional) caches the HTTP responses of the STAC server
+try:
+    import requests_cache
+except ModuleNotFoundError:
+    requests_cache = None
 
 Settings = get_settings()
+logger = Settings.logger
+
+# metadata entries of Sentinel-2 scenes returned from STAC
+_S2_COLUMNS = (
+    "product_uri",
+    "scene_id",
+    "spacecraft_name",
+    "tile_id",
+    "sensing_date",
+    "cloudy_pixel_percentage",
+    "epsg",
+    "sensing_time",
+    "sun_azimuth_angle",
+    "sun_zenith_angle",
+    "geom",
+    "assets",
+)
+# data types of the numeric Sentinel-2 metadata entries. The columns are
+# constructed with these types instead of letting pandas infer them
+_S2_DTYPES = {
+    "cloudy_pixel_percentage": np.float64,
+    "epsg": np.int64,
+    "sun_azimuth_angle": np.float64,
+    "sun_zenith_angle": np.float64,
+}
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """serializes a STAC item to JSON (using orjson if available)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def _json_loads(data: bytes) -> Any:
+    """deserializes a STAC item from JSON (using orjson if available)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# operators of the STAC query extension
+_stac_query_operators = {
+    "<": "lt",
+    "<=": "lte",
+    "==": "eq",
+    "!=": "neq",
+    ">": "gt",
+    ">=": "gte",
+}
+
+# guards the creation of STAC clients
+_client_lock = threading.Lock()
+
+
+@lru_cache(maxsize=4)
+def _create_client(
+    url: str, ca_bundle: bool | str, n_retries: int, epoch: int = 0
+) -> Client:
+    """
+    Opens a connection to a STAC server. The client (including the parsed
+    root catalog) is cached so that subsequent queries re-use its HTTP
+    connection pool and do not fetch the root catalog again.
+
+    :param url:
+        URL of the STAC server
+    :param ca_bundle:
+        `True` to verify certificates or path to a custom CA_BUNDLE
+    :param n_retries:
+        maximum number of HTTPS retries
+    :param epoch:
+        not used for opening the connection. Changing the value creates
+        a new client (i.e., expires the cached one)
+    :returns:
+        STAC client
+    """
+    # open connection to STAC server (specify custom CA_BUNDLE if required)
+    stac_api_io = StacApiIO()
+
+    # cache the HTTP responses (including the POST item searches) on disk
+    # if enabled. The server's Cache-Control headers and ETags are respected
+    if Settings.STAC_HTTP_CACHE and requests_cache is None:
+        logger.warning(
+            "STAC_HTTP_CACHE is enabled but requests-cache is not installed - "
+            "HTTP responses are not cached"
+        )
+    elif Settings.STAC_HTTP_CACHE:
+        session = requests_cache.CachedSession(
+            cache_name=str(Settings.STAC_CACHE_DIR.joinpath("http_cache")),
+            backend="sqlite",
+            expire_after=Settings.STAC_CACHE_TTL,
+            cache_control=True,
+            allowable_methods=("GET", "HEAD", "POST"),
+        )
+        session.headers.update(stac_api_io.session.headers)
+        session.params = stac_api_io.session.params
+        stac_api_io.session = session
+
+    # ..versionadd:: 0.2.1
+    # add retries in case of HTTP 502, 503 and 504 errors and when the
+    # server limits the request rate (429). The item search is sent as POST
+    # request which is not retried by default (the search is read-only)
+    # TODO pass `Retry` object to `StacApiIO` with python >= 3.8
+    # and `pystac-client` >= 0.7.0.
+    retries = Retry(
+        total=n_retries,
+        backoff_factor=1,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"})
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retries)
+    stac_api_io.session.mount("http://", adapter)
+    stac_api_io.session.mount("https://", adapter)
+
+    # handle certificate bundle
+    stac_api_io.session.verify = ca_bundle
+
+    # setup the client
+    return Client.from_file(url, stac_io=stac_api_io)
+
+
+def _get_client(url: str, ca_bundle: bool | str, n_retries: int) -> Client:
+    """
+    Returns the cached client of a STAC server (see `_create_client`). The
+    client is re-created after ``Settings.STAC_ROOT_TTL`` seconds (never
+    if set to 0). The lock makes sure the client is created only once when
+    called from multiple threads.
+    """
+    epoch = 0
+    if Settings.STAC_ROOT_TTL > 0:
+        epoch = int(time.time() // Settings.STAC_ROOT_TTL)
+    with _client_lock:
+        return _create_client(url, ca_bundle, n_retries, epoch)
+
+
+def _stac_cache_file(
+    time_start: datetime,
+    time_end: datetime,
+    collection: str,
+    bounding_box: Polygon | Dict[str, Any],
+    query: Optional[Dict[str, Any]] = None,
+) -> Path:
+    """
+    Returns the path of the cache file for a STAC query. The name of the
+    file is the MD5 hash of the normalized query parameters.
+
+    :param time_start:
+        start of the time period
+    :param time_end:
+        end of the time period
+    :param collection:
+        name of the collection
+    :param bounding_box:
+        bounding box as GeoJSON dict or shapely ``Polygon``
+    :param query:
+        optional STAC query extension parameters
+    :returns:
+        path to the (gzipped JSON lines) cache file
+    """
+    query = {
+        "collection": collection,
+        "bbox": getattr(bounding_box, "__geo_interface__", bounding_box),
+        "start": time_start.strftime("%Y-%m-%d"),
+        "end": time_end.strftime("%Y-%m-%d"),
+        "backend": Settings.STAC_BACKEND.URL,
+        "max_items": Settings.MAX_ITEMS,
+        "query": query,
+    }
+    key = hashlib.md5(
+        json.dumps(query, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return Path(Settings.STAC_CACHE_DIR).joinpath(f"{key}.jsonl.gz")
+
+
+def _spatial_search_kwargs(
+    bounding_box: Polygon | Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Returns the spatial arguments of a STAC search. Rectangular polygons are
+    searched by their `bbox`, other geometries using `intersects`.
+
+    :param bounding_box:
+        area of interest as GeoJSON dict or shapely geometry in geographic
+        coordinates (WGS84)
+    :returns:
+        keyword argument for the STAC search
+    """
+    geom = shapely.geometry.shape(bounding_box)
+    if geom.geom_type == "Polygon" and geom.equals(shapely.box(*geom.bounds)):
+        return {"bbox": list(geom.bounds)}
+    return {"intersects": bounding_box}
+
+
+def _search_stac(
+    collection: str,
+    bounding_box: Polygon,
+    datestr: str,
+    query: Optional[Dict[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Searches the STAC catalog for a single time window.
+
+    :param collection:
+        name of the collection
+    :param bounding_box:
+        bounding box in geographic coordinates (WGS84)
+    :param datestr:
+        time window in the format `%Y-%m-%d/%Y-%m-%d`
+    :param query:
+        optional STAC query extension parameters evaluated by the server
+    :returns:
+        iterator over the dictionary items returned from the STAC query.
+        The result pages are requested while iterating.
+    """
+    # get the (cached) client of the STAC server
+    cat = _get_client(
+        url=Settings.STAC_BACKEND.URL,
+        ca_bundle=Settings.STAC_API_IO_CA_BUNDLE,
+        n_retries=Settings.NUMBER_HTTPS_RETRIES,
+    )
+    # search datasets on catalog. Rectangular areas of interest are passed as
+    # bounding box which is cheaper to evaluate for the server than a geometry
+    search = cat.search(
+        collections=collection,
+        **_spatial_search_kwargs(bounding_box),
+        datetime=datestr,
+        query=query,
+        max_items=Settings.MAX_ITEMS,
+        limit=Settings.LIMIT_ITEMS,
+    )
+    # fetch the items as plain dictionaries (skips creating pystac Items
+    # only to convert them back to dictionaries)
+    return search.items_as_dicts()
+
+
+def _iter_stac_parallel(
+    time_start: datetime,
+    time_end: datetime,
+    collection: str,
+    bounding_box: Polygon,
+    n_splits: int,
+    query: Optional[Dict[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Generator behind `query_stac_parallel`. Yields the items of the
+    sub-periods in temporal order as they are received. The items of
+    sub-periods received before their turn are queued by the thread
+    searching them.
+    """
+    # split the time period into (inclusive) sub-periods of full days
+    day_start = time_start.date() if isinstance(time_start, datetime) else time_start
+    day_end = time_end.date() if isinstance(time_end, datetime) else time_end
+    n_days = (day_end - day_start).days + 1
+    n_splits = max(1, min(n_splits, n_days))
+    bounds = [
+        day_start + timedelta(days=n_days * idx // n_splits)
+        for idx in range(n_splits + 1)
+    ]
+    datestrs = [
+        f'{bounds[idx].strftime("%Y-%m-%d")}/'
+        f'{(bounds[idx + 1] - timedelta(days=1)).strftime("%Y-%m-%d")}'
+        for idx in range(n_splits)
+    ]
+    if n_splits == 1:
+        yield from _search_stac(collection, bounding_box, datestrs[0], query)
+        return
+
+    # set once enough items were yielded (or the caller stopped iterating)
+    # so that the threads stop requesting further result pages
+    stop = threading.Event()
+
+    def _search_into(datestr: str, items: queue.SimpleQueue) -> None:
+        try:
+            for scene in _search_stac(collection, bounding_box, datestr, query):
+                if stop.is_set():
+                    break
+                items.put(scene)
+        finally:
+            # signals the end of the sub-period (also on errors)
+            items.put(None)
+
+    with ThreadPoolExecutor(max_workers=n_splits) as executor:
+        queues = [queue.SimpleQueue() for _ in datestrs]
+        futures = [
+            executor.submit(_search_into, datestr, items)
+            for datestr, items in zip(datestrs, queues)
+        ]
+        try:
+            # items at the boundaries of the sub-periods might be returned twice
+            scene_ids = set()
+            for future, items in zip(futures, queues):
+                for scene in iter(items.get, None):
+                    if scene["id"] in scene_ids:
+                        continue
+                    scene_ids.add(scene["id"])
+                    yield scene
+                    if len(scene_ids) == Settings.MAX_ITEMS:
+                        return
+                # raise errors of the search
+                future.result()
+        finally:
+            stop.set()
+
+
+def query_stac_parallel(
+    time_start: datetime,
+    time_end: datetime,
+    collection: str,
+    bounding_box: Polygon,
+    n_splits: int = 8,
+    query: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Queries a STAC catalog by splitting the time period into `n_splits`
+    sub-periods that are searched concurrently. This speeds up queries
+    returning many items as the paginated requests are sent in parallel.
+
+    :param time_start:
+        start of the time period
+    :param time_end:
+        end of the time period
+    :param collection:
+        name of the collection
+        (e.g., sentinel-2-l2a for Sentinel-2 L2A data)
+    :param bounding_box:
+        bounding box in geographic coordinates (WGS84)
+    :param n_splits:
+        number of sub-periods to search in parallel. The actual number
+        is limited by the number of days in the time period.
+    :param query:
+        optional STAC query extension parameters evaluated by the server
+        (e.g., ``{"eo:cloud_cover": {"lt": 10}}``)
+    :returns:
+        list of dictionary items returned from the STAC query
+    """
+    return list(
+        _iter_stac_parallel(
+            time_start=time_start,
+            time_end=time_end,
+            collection=collection,
+            bounding_box=bounding_box,
+            n_splits=n_splits,
+            query=query,
+        )
+    )
+
+
+def iter_stac(
+    time_start: datetime,
+    time_end: datetime,
+    collection: str,
+    bounding_box: Polygon,
+    query: Optional[Dict[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Queries a STAC (Spatio-Temporal Asset Catalog) by bounding box and
+    time period and yields the items of a user-defined collection as they
+    are received. This allows to process (and filter) large query results
+    without keeping all items in memory.
+
+    This is a sensor-agnostic function called by sensor-specific ones. The
+    time period is split into ``Settings.STAC_N_SPLITS`` sub-periods searched
+    in parallel (see `query_stac_parallel`).
+
+    If ``Settings.STAC_CACHE_TTL`` is larger than 0 (disabled by default),
+    responses are cached on disk (``Settings.STAC_CACHE_DIR``) and re-used
+    for identical queries for ``Settings.STAC_CACHE_TTL`` seconds. Items
+    added to the catalog in the meantime are not returned for cached queries.
+
+    :param time_start:
+        start of the time period
+    :param time_end:
+        end of the time period
+    :param collection:
+        name of the collection
+        (e.g., sentinel-2-l2a for Sentinel-2 L2A data)
+    :param bounding_box:
+        bounding box either as extended well-known text in geographic coordinates
+        or as shapely ``Polygon`` in geographic coordinates (WGS84)
+    :param query:
+        optional STAC query extension parameters evaluated by the server
+        (e.g., ``{"eo:cloud_cover": {"lt": 10}}``)
+    :returns:
+        iterator over the dictionary items returned from the STAC query
+    """
+    scenes = _iter_stac_parallel(
+        time_start=time_start,
+        time_end=time_end,
+        collection=collection,
+        bounding_box=bounding_box,
+        n_splits=Settings.STAC_N_SPLITS,
+        query=query,
+    )
+    if Settings.STAC_CACHE_TTL <= 0:
+        yield from scenes
+        return
+
+    # check if the query was sent recently and its response is still cached
+    cache_file = _stac_cache_file(
+        time_start=time_start,
+        time_end=time_end,
+        collection=collection,
+        bounding_box=bounding_box,
+        query=query,
+    )
+    try:
+        cached = time.time() - cache_file.stat().st_mtime < Settings.STAC_CACHE_TTL
+    except OSError:
+        cached = False
+    if cached:
+        with gzip.open(cache_file, "rb") as src:
+            for line in src:
+                yield _json_loads(line)
+        return
+
+    # store the items in the cache (one JSON record per line) while they are
+    # yielded. The items are written to a temporary file first so that
+    # readers never see a partially written (or aborted) response
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        dst = gzip.open(tmp_file, "wb")
+    except OSError as e:
+        logger.debug(f"Could not cache STAC response: {e}")
+        yield from scenes
+        return
+    try:
+        with dst:
+            for scene in scenes:
+                dst.write(_json_dumps(scene) + b"\n")
+                yield scene
+        os.replace(tmp_file, cache_file)
+    finally:
+        if tmp_file.exists():
+            tmp_file.unlink()
 
 
 def query_stac(
@@ -30,12 +493,13 @@ def query_stac(
     time_end: datetime,
     collection: str,
     bounding_box: Polygon,
+    query: Optional[Dict[str, Any]] = None,
 ) -> List[Dict[str, Any]]:
     """
     Queries a STAC (Spatio-Temporal Asset Catalog) by bounding box and
     time period to get items from a user-defined collection.
 
-    This is a sensor-agnostic function called by sensor-specific ones.
+    This is a sensor-agnostic function. See `iter_stac` for details.
 
     :param time_start:
         start of the time period
@@ -47,96 +511,208 @@ def query_stac(
     :param bounding_box:
         bounding box either as extended well-known text in geographic coordinates
         or as shapely ``Polygon`` in geographic coordinates (WGS84)
+    :param query:
+        optional STAC query extension parameters evaluated by the server
+        (e.g., ``{"eo:cloud_cover": {"lt": 10}}``)
     :returns:
         list of dictionary items returned from the STAC query
     """
-    # open connection to STAC server (specify custom CA_BUNDLE if required)
-    stac_api_io = StacApiIO()
+    return list(
+        iter_stac(
+            time_start=time_start,
+            time_end=time_end,
+            collection=collection,
+            bounding_box=bounding_box,
+            query=query,
+        )
+    )
 
-    # ..versionadd:: 0.2.1
-    # add retries in case of HTTP 502, 503 and 504 errors
-    # TODO pass `Retry` object to `StacApiIO` with python >= 3.8
-    # and `pystac-client` >= 0.7.0.
-    retries = Retry(
-        total=Settings.NUMBER_HTTPS_RETRIES,
-        backoff_factor=1,
-        status_forcelist=[502, 503, 504])
-    stac_api_io.session.mount("http://", HTTPAdapter(max_retries=retries))
-    stac_api_io.session.mount("https://", HTTPAdapter(max_retries=retries))
 
-    # handle certificate bundle
-    stac_api_io.session.verify = Settings.STAC_API_IO_CA_BUNDLE
+def _stac_query_from_filters(
+    metadata_filters: List[Filter], properties: Dict[str, str]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Translates metadata filters on numeric entities into parameters of the
+    STAC query extension so that the STAC server discards the scenes not
+    fulfilling them.
 
-    # setup the client
-    cat = Client.from_file(Settings.STAC_BACKEND.URL, stac_io=stac_api_io)
+    :param metadata_filters:
+        scene metadata filters
+    :param properties:
+        mapping of the entities that can be filtered on the STAC server
+        to the names of the corresponding STAC properties
+    :returns:
+        STAC query extension parameters (empty if no filter can be passed)
+    """
+    query = {}
+    for _filter in metadata_filters:
+        if _filter.entity not in properties:
+            continue
+        if isinstance(_filter.value, bool) or \
+                not isinstance(_filter.value, (int, float)):
+            continue
+        stac_property = properties[_filter.entity]
+        query.setdefault(stac_property, {})[
+            _stac_query_operators[_filter.operator]
+        ] = _filter.value
+    return query
 
-    # transform dates into the required format (%Y-%m-%d)
-    datestr = f'{time_start.strftime("%Y-%m-%d")}/{time_end.strftime("%Y-%m-%d")}'
-    # search datasets on catalog
-    search = cat.search(
-        collections=collection,
-        intersects=bounding_box,
-        datetime=datestr,
-        max_items=Settings.MAX_ITEMS,
-        limit=Settings.LIMIT_ITEMS,
+
+def query_stac_batch(
+    requests: Dict[str, Dict[str, Any]],
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Sends several STAC queries (e.g., for different collections) concurrently.
+    The queries share the cached STAC client and its connection pool.
+
+    :param requests:
+        mapping of user-defined request IDs to the keyword arguments
+        of the queries (see `query_stac`)
+    :returns:
+        mapping of the request IDs to the list of dictionary items returned
+        from the corresponding STAC query
+    """
+    with ThreadPoolExecutor(max_workers=Settings.STAC_BATCH_WORKERS) as executor:
+        futures = {
+            request_id: executor.submit(query_stac, **stac_kwargs)
+            for request_id, stac_kwargs in requests.items()
+        }
+        return {
+            request_id: future.result() for request_id, future in futures.items()
+        }
+
+
+def _asset_links(assets: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+    """
+    Reduces the assets of a Sentinel-2 STAC item to their links. The remaining
+    asset metadata (e.g., band descriptions, roles, titles) is not used for
+    reading Sentinel-2 data and takes most of the memory for large query
+    results. The assets of the other sensors are kept as they are.
+
+    :param assets:
+        assets of a STAC item
+    :returns:
+        assets with the `href` entry, only
+    """
+    return {name: {"href": asset["href"]} for name, asset in assets.items()}
+
+
+def _sensing_dates(metadata_list: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Parses the sensing times of a list of scenes into dates in a
+    single vectorized call.
+
+    :param metadata_list:
+        scene metadata with ISO 8601 formatted "sensing_time" entries
+    :returns:
+        array of sensing dates (`datetime.date`)
+    """
+    sensing_times = pd.to_datetime(
+        [x["sensing_time"] for x in metadata_list], format="ISO8601", cache=True
     )
-    # fetch items and convert them to GeoDataFrame, drop all records with
-    # too many clouds
-    items = search.item_collection()
-    item_json = items.to_dict()
-    scenes = item_json["features"]
-    return scenes
+    return sensing_times.date
+
+
+def _compile_filters(
+    metadata_filters: List[Filter],
+) -> List[Tuple[str, Callable[[Any], bool]]]:
+    """
+    Prepares the metadata filters for evaluating them on many scenes. Filters
+    selecting the collection (processing level, product type) are dropped.
+
+    :param metadata_filters:
+        scene metadata filters
+    :returns:
+        list of filter entities and the functions evaluating them
+    """
+    return [
+        (_filter.entity, _filter.evaluate)
+        for _filter in metadata_filters
+        if _filter.entity not in ("processing_level", "product_type")
+    ]
 
 
 def _filter_criteria_fulfilled(
-    metadata_dict: Dict[str, Any], metadata_filters: List[Filter]
+    metadata_dict: Dict[str, Any],
+    compiled_filters: List[Tuple[str, Callable[[Any], bool]]],
 ) -> bool:
     """
     Check if a scene fulfills the metadata filter criteria
 
     :param metadata_dict:
         scene metadata returned from STAC item
-    :param metadata_filters:
-        scene metadata filters to apply on metadata_dict
+    :param compiled_filters:
+        scene metadata filters to apply on metadata_dict as returned
+        from `_compile_filters`
     :returns:
         `True` if all criteria passed, `False` if a single
         criterion was not met.
     """
-    criteria_fulfilled = []
-    for _filter in metadata_filters:
-        if _filter.entity in ["processing_level", "product_type"]:
+    for entity, evaluate in compiled_filters:
+        if entity not in metadata_dict:
+            warnings.warn(
+                f"{entity} could not be retrieved from STAC -> skipping filter"
+            )
             continue
-        if _filter.entity not in metadata_dict.keys():
+        # check if the filter condition is met (stop at the first failure)
+        if not evaluate(metadata_dict[entity]):
+            return False
+    return True
+
+
+def _typed_column(values: List[Any], dtype: type) -> np.ndarray | List[Any]:
+    """
+    Converts a column of metadata entries into an array of the given
+    data type. The entries are returned unchanged if they cannot be
+    converted (e.g., missing entries in an integer column).
+
+    :param values:
+        metadata entries of a column
+    :param dtype:
+        numpy data type of the column
+    :returns:
+        typed array or the original entries
+    """
+    try:
+        return np.asarray(values, dtype=dtype)
+    except (TypeError, ValueError):
+        return values
+
+
+def _filter_mask(
+    columns: Dict[str, List[Any]],
+    compiled_filters: List[Tuple[str, Callable[[Any], bool]]],
+) -> np.ndarray:
+    """
+    Column-wise version of `_filter_criteria_fulfilled`. Filters on numeric
+    entities are evaluated on the whole column at once.
+
+    :param columns:
+        scene metadata returned from STAC as dictionary of columns
+    :param compiled_filters:
+        scene metadata filters to apply as returned from `_compile_filters`
+    :returns:
+        boolean array with `True` for the scenes fulfilling all criteria
+    """
+    n_scenes = len(next(iter(columns.values()), []))
+    mask = np.ones(n_scenes, dtype=bool)
+    for entity, evaluate in compiled_filters:
+        if entity not in columns:
             warnings.warn(
-                f"{_filter.entity} could not be retrieved from STAC -> skipping filter"
+                f"{entity} could not be retrieved from STAC -> skipping filter"
             )
-        # check if the filter condition is met
-        # check if the metadata item to filter is a list or single value
-        if not isinstance(metadata_dict[_filter.entity], list):
-            if isinstance(metadata_dict[_filter.entity], str):
-                eval_str = \
-                    f'metadata_dict["{_filter.entity}"] ' + \
-                    f'{_filter.operator} "{_filter.value}"'
-            else:
-                eval_str = \
-                    f'metadata_dict["{_filter.entity}"] ' + \
-                    f'{_filter.operator} {_filter.value}'
-            condition_met = eval(eval_str)
+            continue
+        values = pd.Series(columns[entity])
+        if pd.api.types.is_numeric_dtype(values) and \
+                not pd.api.types.is_bool_dtype(values):
+            mask &= np.asarray(evaluate(values.to_numpy()), dtype=bool)
         else:
-            # TODO: this is not really elegant and might not deliver always the
-            # results we are looking for ...
-            # convert _filter.value to list if it is not yet
-            value = _filter.value
-            if not isinstance(value, list):
-                value = [value]
-            # redefine the operators to work with sets
-            if _filter.operator == '==':
-                condition_met = set(value).issubset(metadata_dict[_filter.entity])
-            elif _filter.operator == '!=':
-                condition_met = not set(value).issubset(metadata_dict[_filter.entity])
-        criteria_fulfilled.append(condition_met)
-
-    return all(criteria_fulfilled)
+            mask &= np.fromiter(
+                (evaluate(value) for value in columns[entity]),
+                dtype=bool,
+                count=n_scenes,
+            )
+    return mask
 
 
 @prepare_bbox
@@ -153,73 +729,120 @@ def sentinel2(metadata_filters: List[Filter], **kwargs) -> gpd.GeoDataFrame:
         dataframe with references to found Sentinel-2 scenes
     """
     # check for processing level of the data and set the collection accordingly
-    filter_entities = [x.entity for x in metadata_filters]
-    if "processing_level" in filter_entities:
-        processing_level = [
-            x.value for x in metadata_filters if x.entity == "processing_level"
-        ][0]
-        processing_level = processing_level.replace("-", "_")
-    processing_level_stac = eval(f"Settings.STAC_BACKEND.S2{processing_level}")
+    # (defaults to Level-2A if not stated otherwise in the metadata filters)
+    filters_by_entity = {x.entity: x for x in metadata_filters}
+    processing_level = "Level-2A"
+    if "processing_level" in filters_by_entity:
+        processing_level = filters_by_entity["processing_level"].value
+    processing_level = processing_level.replace("-", "_")
+    processing_level_stac = getattr(Settings.STAC_BACKEND, f"S2{processing_level}")
     kwargs.update({"collection": processing_level_stac})
 
-    # query STAC catalog
-    stac_kwargs = kwargs.copy()
-    scenes = query_stac(**stac_kwargs)
-
-    # get STAC provider specific naming conventions
+    # get STAC provider specific naming conventions (resolved once for
+    # all scenes)
     s2 = Settings.STAC_BACKEND.Sentinel2
-    # loop over scenes found and apply the Filters provided
-    metadata_list = []
-    for scene in scenes:
+
+    # query STAC catalog. Filters on the cloud cover are evaluated by the
+    # STAC server already (they are checked again below in case the server
+    # does not support the query extension)
+    stac_kwargs = kwargs.copy()
+    query = _stac_query_from_filters(
+        metadata_filters, properties={"cloudy_pixel_percentage": s2.cloud_cover}
+    )
+    if query:
+        stac_kwargs.update({"query": query})
+    tile_id_key = s2.tile_id
+    tile_id_is_list = isinstance(tile_id_key, list)
+    product_uri_key, scene_id_key = s2.product_uri, s2.scene_id
+    platform_key, cloud_cover_key, epsg_key = s2.platform, s2.cloud_cover, s2.epsg
+    sensing_time_key = s2.sensing_time
+    sun_azimuth_key, sun_zenith_key = s2.sun_azimuth_angle, s2.sun_zenith_angle
+    # filters on the cloud cover are checked first for every scene to skip
+    # cloudy scenes right away. The other filters are applied afterwards
+    compiled_filters = _compile_filters(metadata_filters)
+    cloud_cover_filters = [
+        evaluate for entity, evaluate in compiled_filters
+        if entity == "cloudy_pixel_percentage"
+    ]
+    compiled_filters = [
+        x for x in compiled_filters if x[0] != "cloudy_pixel_percentage"
+    ]
+
+    # loop over scenes found (as they are received). The metadata is collected
+    # column-wise to avoid transposing records afterwards
+    cols = {key: [] for key in _S2_COLUMNS if key != "sensing_date"}
+    # bind the append methods of the columns to local names (resolved once)
+    add_product_uri = cols["product_uri"].append
+    add_scene_id = cols["scene_id"].append
+    add_spacecraft_name = cols["spacecraft_name"].append
+    add_tile_id = cols["tile_id"].append
+    add_cloud_cover = cols["cloudy_pixel_percentage"].append
+    add_epsg = cols["epsg"].append
+    add_sensing_time = cols["sensing_time"].append
+    add_sun_azimuth = cols["sun_azimuth_angle"].append
+    add_sun_zenith = cols["sun_zenith_angle"].append
+    add_geom = cols["geom"].append
+    add_assets = cols["assets"].append
+    for scene in iter_stac(**stac_kwargs):
         # extract scene metadata required for Sentinel-2
         # map the STAC keys to eodal's naming convention
         props = scene["properties"]
+        cloud_cover = props[cloud_cover_key]
+        if not all(evaluate(cloud_cover) for evaluate in cloud_cover_filters):
+            continue
         # tile-id requires some string handling in case of AWS
-        if isinstance(s2.tile_id, list):
-            tile_id = "".join(
-                [str(props[x]) for x in Settings.STAC_BACKEND.Sentinel2.tile_id]
-            )
+        if tile_id_is_list:
+            tile_id = "".join([str(props[x]) for x in tile_id_key])
         else:
-            tile_id = props[Settings.STAC_BACKEND.Sentinel2.tile_id]
+            tile_id = props[tile_id_key]
         # the product_uri is also not handled the same way by the different
         # STAC providers
-        try:
-            product_uri = scene[s2.product_uri]
-        except KeyError:
-            product_uri = props[s2.product_uri]
+        if product_uri_key in scene:
+            product_uri = scene[product_uri_key]
+        else:
+            product_uri = props[product_uri_key]
         # same for the scene_id
-        try:
-            scene_id = props[s2.scene_id]
-        except KeyError:
-            scene_id = scene[s2.scene_id]
+        if scene_id_key in props:
+            scene_id = props[scene_id_key]
+        else:
+            scene_id = scene[scene_id_key]
         # TODO: think about a more generic way to do this. The problem is:
         # we need to map the different STAC provider settings into EOdals
         # metadata model to avoid having the user to think about it
-        meta_dict = {
-            "product_uri": product_uri,
-            "scene_id": scene_id,
-            "spacecraft_name": props[s2.platform],
-            "tile_id": tile_id,
-            "sensing_date": datetime_to_date(props[s2.sensing_time]),
-            "cloudy_pixel_percentage": props[s2.cloud_cover],
-            "epsg": props[s2.epsg],
-            "sensing_time": datetime.strptime(
-                props[s2.sensing_time], s2.sensing_time_fmt
-            ),
-            "sun_azimuth_angle": props[s2.sun_azimuth_angle],
-            "sun_zenith_angle": props[s2.sun_zenith_angle],
-            "geom": Polygon(scene["geometry"]["coordinates"][0]),
-        }
+        add_product_uri(product_uri)
+        add_scene_id(scene_id)
+        add_spacecraft_name(props[platform_key])
+        add_tile_id(tile_id)
+        add_cloud_cover(cloud_cover)
+        add_epsg(props[epsg_key])
+        # converted to datetime (and date) for all scenes at once
+        add_sensing_time(props[sensing_time_key])
+        add_sun_azimuth(props[sun_azimuth_key])
+        add_sun_zenith(props[sun_zenith_key])
+        # converted to polygons for all scenes at once
+        add_geom(scene["geometry"]["coordinates"][0])
         # get links to actual Sentinel-2 bands
-        meta_dict["assets"] = scene["assets"]
+        add_assets(_asset_links(scene["assets"]))
 
-        # apply filters
-        append_scene = _filter_criteria_fulfilled(meta_dict, metadata_filters)
-        if append_scene:
-            metadata_list.append(meta_dict)
+    # construct the numeric columns with their data types
+    for key, dtype in _S2_DTYPES.items():
+        cols[key] = _typed_column(cols[key], dtype)
 
+    # parse the sensing times and footprints of all scenes at once. This is
+    # done before filtering so that the filters see the final values
+    sensing_time = pd.to_datetime(
+        cols["sensing_time"], format=s2.sensing_time_fmt, cache=True
+    )
+    cols["sensing_time"] = sensing_time
+    cols["sensing_date"] = sensing_time.date
+    cols["geom"] = polygons_from_rings(cols["geom"])
+
+    # apply the Filters provided on all scenes at once
+    selected = _filter_mask(cols, compiled_filters)
+    df = pd.DataFrame({key: cols[key] for key in _S2_COLUMNS})
+    df = df.loc[selected].reset_index(drop=True)
     # create geppandas GeoDataFrame out of scene metadata records
-    return prepare_gdf(metadata_list)
+    return prepare_gdf(df)
 
 
 @prepare_bbox
@@ -245,32 +868,45 @@ def sentinel1(metadata_filters: List[Filter], **kwargs) -> gpd.GeoDataFrame:
 
     # construct collection string (defaults to S1RTC if not stated otherwise in the
     # metadata filters)
+    filters_by_entity = {x.entity: x for x in metadata_filters}
     collection = "S1"
-    if len([x.entity for x in metadata_filters if x.entity == "product_type"]) == 1:
-        collection += [x.value for x in metadata_filters if x.entity == "product_type"][
-            0
-        ]
+    if "product_type" in filters_by_entity:
+        collection += filters_by_entity["product_type"].value
     else:
         collection += "RTC"
 
     # query the catalog
     stac_kwargs = kwargs.copy()
-    stac_kwargs.update({"collection": eval(f"Settings.STAC_BACKEND.{collection}")})
-    scenes = query_stac(**stac_kwargs)
-    metadata_list = []
-    for scene in scenes:
+    stac_kwargs.update({"collection": getattr(Settings.STAC_BACKEND, collection)})
+    scenes_metadata = []
+    bboxes = []
+    for scene in iter_stac(**stac_kwargs):
         metadata_dict = scene["properties"]
         metadata_dict["assets"] = scene["assets"]
         metadata_dict["sensing_time"] = metadata_dict["datetime"]
-        metadata_dict["sensing_date"] = datetime_to_date(metadata_dict['sensing_time'])
         del metadata_dict["datetime"]
-        # infer EPSG code of the scene in UTM coordinates from its bounding box
-        bbox = box(*scene["bbox"])
-        metadata_dict["epsg"] = infer_utm_zone(bbox)
-        metadata_dict["geom"] = bbox
-        # apply filters
-        append_scene = _filter_criteria_fulfilled(metadata_dict, metadata_filters)
-        if append_scene:
+        scenes_metadata.append(metadata_dict)
+        bboxes.append(scene["bbox"])
+
+    # the scene footprints are the bounding boxes of the scenes. They are
+    # constructed for all scenes at once
+    geoms = shapely.box(*np.array(bboxes, dtype=np.float64).reshape(-1, 4).T)
+    # infer EPSG codes of the scenes in UTM coordinates from their bounding box
+    epsg_codes = infer_utm_zones(geoms).tolist()
+    # parse the sensing times of the scenes at once
+    sensing_dates = _sensing_dates(scenes_metadata)
+
+    # apply filters (after deriving the footprints, EPSG codes and sensing
+    # dates so that they can be filtered as well)
+    compiled_filters = _compile_filters(metadata_filters)
+    metadata_list = []
+    for metadata_dict, geom, epsg, sensing_date in zip(
+        scenes_metadata, geoms, epsg_codes, sensing_dates
+    ):
+        metadata_dict["sensing_date"] = sensing_date
+        metadata_dict["epsg"] = epsg
+        metadata_dict["geom"] = geom
+        if _filter_criteria_fulfilled(metadata_dict, compiled_filters):
             metadata_list.append(metadata_dict)
 
     # create geppandas GeoDataFrame out of scene metadata records
@@ -296,26 +932,29 @@ def landsat(metadata_filters: List[Filter], **kwargs) -> gpd.GeoDataFrame:
 
     # query the catalog
     stac_kwargs = kwargs.copy()
-    scenes = query_stac(**stac_kwargs)
-
-    if len(scenes) == 0:
-        raise ValueError(f'STAC query returned no results! {stac_kwargs}')
 
-    metadata_list = []
-    for scene in scenes:
+    scenes_metadata = []
+    for scene in iter_stac(**stac_kwargs):
         metadata_dict = scene['properties']
         metadata_dict['assets'] = scene['assets']
         metadata_dict["sensing_time"] = metadata_dict["datetime"]
-        metadata_dict["sensing_date"] = datetime_to_date(metadata_dict['sensing_time'])
         del metadata_dict["datetime"]
+        scenes_metadata.append(metadata_dict)
+    if len(scenes_metadata) == 0:
+        raise ValueError(f'STAC query returned no results! {stac_kwargs}')
+
+    # parse the sensing times of the scenes at once (before filtering so that
+    # the sensing date can be filtered as well)
+    sensing_dates = _sensing_dates(scenes_metadata)
+
+    compiled_filters = _compile_filters(metadata_filters)
+    metadata_list = []
+    for metadata_dict, sensing_date in zip(scenes_metadata, sensing_dates):
+        metadata_dict['sensing_date'] = sensing_date
         # apply filters
-        append_scene = _filter_criteria_fulfilled(metadata_dict, metadata_filters)
-        if append_scene:
-            metadata_list.append(metadata_dict)
-        # reconstruct the scene footprint
-        transform = metadata_dict['proj:transform']
-        shape = metadata_dict['proj:shape']
-        metadata_dict['geom'] = box_from_transform(transform, shape)
+        append_scene = _filter_criteria_fulfilled(metadata_dict, compiled_filters)
+        if not append_scene:
+            continue
         metadata_dict['epsg'] = metadata_dict['proj:epsg']
 
         # extract angles
@@ -325,6 +964,15 @@ def landsat(metadata_filters: List[Filter], **kwargs) -> gpd.GeoDataFrame:
         del metadata_dict['view:sun_elevation']
         metadata_dict['sensor_zenith_angle'] = metadata_dict['view:off_nadir']
         del metadata_dict['view:off_nadir']
+        metadata_list.append(metadata_dict)
+
+    # reconstruct the scene footprints of the remaining scenes at once
+    geoms = boxes_from_transforms(
+        transforms=[x['proj:transform'] for x in metadata_list],
+        shapes=[x['proj:shape'] for x in metadata_list],
+    )
+    for metadata_dict, geom in zip(metadata_list, geoms):
+        metadata_dict['geom'] = geom
 
     if len(metadata_list) == 0:
         raise ValueError(
@@ -20,16 +20,46 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 from __future__ import annotations
 
 import os
-import subprocess
 import pandas as pd
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
 from eodal.utils.exceptions import DataNotFoundError
 
 
+@lru_cache(maxsize=1)
+def _linux_cifs_mounts() -> Tuple[Tuple[str, Path], ...]:
+    """
+    Returns the CIFS mount table of a Linux operating system. Only mount
+    points the current user has read access to are kept (another user
+    might have mounted the NAS manually).
+
+    The mount table is read once and cached. Call
+    `_linux_cifs_mounts.cache_clear()` if file systems were (un)mounted
+    in the meantime.
+
+    :returns:
+        tuple of mount table entries and their local mount points
+    """
+    try:
+        with open("/proc/mounts", "r") as src:
+            lines = [line for line in src if "cifs" in line]
+    except OSError:
+        return ()
+    mounts = []
+    for line in lines:
+        # data is on mounted share -> get local file system mapper
+        local_path = line.split(" ")[1]
+        if os.access(local_path, os.R_OK):
+            mounts.append((line, Path(local_path)))
+    return tuple(mounts)
+
+
+@lru_cache(maxsize=None)
 def _check_linux_cifs(ip: Union[str, Path]) -> Path:
     """
     Searches for mount point of an external file system on a Linux
@@ -39,46 +69,27 @@ def _check_linux_cifs(ip: Union[str, Path]) -> Path:
         IP or network address of the NAS device for which
         to search the mount point.
     """
-
-    res = Path("")
-
-    exe = "cat /proc/mounts | grep cifs"
-    response = subprocess.getoutput(exe)
-    lines = response.split("\n")
-    for line in lines:
+    for line, local_path in _linux_cifs_mounts():
         if str(ip) in line:
-            # data is on mounted share -> get local file system mapper
-            local_path = line.split(" ")[1]
-            # check if current user has access to read local path, otherwise keep
-            # searching (might happen if another user manually mounts the NAS)
-            if os.access(local_path, os.R_OK):
-                res = Path(local_path)
-                break
+            return local_path
+    return Path("")
 
-    return res
 
-
-def reconstruct_path(
+def _reconstruct_share(
     record: pd.Series,
-    is_raw_data: Optional[bool] = True,
     path_to_nas: Optional[bool] = True,
 ) -> Path:
     """
-    auxiliary function to reconstruct the actual dataset location
-    based on the entries in the metatdata base. Raises an error
-    if the dataset was not found.
+    auxiliary function to reconstruct the location of the storage share
+    a dataset is stored in based on the entries in the metadata base.
 
     :param record:
         single record from the metadata base denoting a single dataset
-    :param is_raw_data:
-        if True (default) assumes the queried data is Sentinel-2 ESA
-        derived "raw" data in .SAFE archive format and not already processed
-        by eodal to multi-band geoTiff files.
     :param path_to_nas:
         if True (default) tries to find the mount point of the NAS file system
         on the local machine's file system.
-    :return in_dir:
-        filepath to the directory for the local machine
+    :return share:
+        path to the storage share on the local machine
     """
 
     ip = Path(record.storage_device_ip)
@@ -102,9 +113,10 @@ def reconstruct_path(
             share = mount_point.joinpath(record.storage_share)
 
         # Windows does not know about mount points, it should be able to work
-        # with network paths
+        # with network paths. On Windows, `Path` converts the slashes into
+        # Windows separators (and "//" into UNC notation) itself
         elif os.name == "nt":
-            share = Path(record.storage_device_ip).joinpath(record.storage_share)
+            share = Path(record.storage_device_ip, record.storage_share)
             # if share is not available test alias if available
             if not share.exists():
                 if record.storage_device_ip_alias == "":
@@ -112,20 +124,41 @@ def reconstruct_path(
                         "Could not find network path for external file system"
                     )
 
-                share = Path(record.storage_device_ip.alias).joinpath(
-                    record.storage_share
+                share = Path(
+                    record.storage_device_ip_alias, record.storage_share
                 )
 
     # path is to local filesystem or does not require mount points
     else:
         share = Path(record.storage_share)
 
-    # the path should work 'as it is' on Windows machines by replacing the slashes
-    if os.name == "nt":
-        # TODO test on Windows
-        tmp = str(share)
-        tmp = tmp.replace(r"//", r"\\").replace(r"/", os.sep)
-        share = Path(tmp)
+    return share
+
+
+def reconstruct_path(
+    record: pd.Series,
+    is_raw_data: Optional[bool] = True,
+    path_to_nas: Optional[bool] = True,
+) -> Path:
+    """
+    auxiliary function to reconstruct the actual dataset location
+    based on the entries in the metatdata base. Raises an error
+    if the dataset was not found.
+
+    :param record:
+        single record from the metadata base denoting a single dataset
+    :param is_raw_data:
+        if True (default) assumes the queried data is Sentinel-2 ESA
+        derived "raw" data in .SAFE archive format and not already processed
+        by eodal to multi-band geoTiff files.
+    :param path_to_nas:
+        if True (default) tries to find the mount point of the NAS file system
+        on the local machine's file system.
+    :return in_dir:
+        filepath to the directory for the local machine
+    """
+
+    share = _reconstruct_share(record=record, path_to_nas=path_to_nas)
 
     if not share.exists():
         raise DataNotFoundError(f"Could not find {share}")
@@ -143,3 +176,62 @@ def reconstruct_path(
             raise NotADirectoryError(f"Could not find {str(in_dir)}")
 
     return in_dir
+
+
+def reconstruct_paths(
+    df: pd.DataFrame,
+    is_raw_data: Optional[bool] = True,
+    path_to_nas: Optional[bool] = True,
+) -> pd.Series:
+    """
+    Reconstructs the actual dataset locations of all records in a
+    DataFrame from the metadata base. The storage shares are resolved
+    and listed once for all records stored in them (instead of checking
+    the existence of each dataset separately).
+
+    :param df:
+        records from the metadata base denoting one dataset each
+    :param is_raw_data:
+        if True (default) assumes the queried data is Sentinel-2 ESA
+        derived "raw" data in .SAFE archive format.
+    :param path_to_nas:
+        if True (default) tries to find the mount point of the NAS file system
+        on the local machine's file system.
+    :returns:
+        filepaths to the dataset directories for the local machine
+    """
+    paths = pd.Series(index=df.index, dtype=object)
+    if df.empty:
+        return paths
+    # re-read the mount table to account for file systems (un)mounted since
+    # the last call
+    _linux_cifs_mounts.cache_clear()
+    _check_linux_cifs.cache_clear()
+
+    share_columns = [
+        col for col in
+        ["storage_device_ip", "storage_device_ip_alias", "storage_share"]
+        if col in df.columns
+    ]
+    for _, group in df.groupby(share_columns, sort=False, dropna=False):
+        share = _reconstruct_share(record=group.iloc[0], path_to_nas=path_to_nas)
+        if not share.exists():
+            raise DataNotFoundError(f"Could not find {share}")
+        if not is_raw_data:
+            paths[group.index] = [share] * group.shape[0]
+            continue
+        # list the content of the share once
+        with os.scandir(share) as entries:
+            children = {entry.name for entry in entries}
+        for idx, product_uri in group["product_uri"].items():
+            # handle products not ending with '.SAFE' (e.g., when data comes
+            # from Mundi)
+            for name in (product_uri, product_uri.replace(".SAFE", "")):
+                if name in children:
+                    paths[idx] = share.joinpath(name)
+                    break
+            else:
+                raise NotADirectoryError(
+                    f"Could not find {str(share.joinpath(product_uri))}"
+                )
+    return paths
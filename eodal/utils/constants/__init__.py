@@ -1,5 +1,10 @@
 from enum import Enum
 
+# OpenCV's nearest neighbor interpolation flag (`cv2.INTER_NEAREST_EXACT`). It
+# is used as default resampling method and defined here so that OpenCV is only
+# imported when data is actually resampled
+INTER_NEAREST_EXACT = 6
+
 
 class ProcessingLevels(Enum):
     """
@@ -20,13 +20,18 @@ from __future__ import annotations
 
 import geopandas as gpd
 import json
+import numpy as np
 import pandas as pd
 import rasterio as rio
+import shapely
 
 from copy import deepcopy
+from itertools import chain
 from pathlib import Path
 from rasterio.mask import raster_geometry_mask
+from shapely import wkt
 from shapely.geometry import box, Point, Polygon
+from shapely.geometry.base import BaseGeometry
 
 from eodal.core.utils.geometry import convert_3D_2D
 
@@ -83,8 +88,81 @@ def box_from_transform(
     return box(minx, miny, maxx, maxy)
 
 
+def boxes_from_transforms(
+        transforms: list[list[float] | tuple],
+        shapes: list[list[int] | tuple[int, int]]
+) -> np.ndarray:
+    """
+    Vectorized version of `box_from_transform` for a set of
+    rasters.
+
+    :param transforms:
+        affine-like transform parameters of the rasters.
+    :param shapes:
+        raster shapes (nrows, ncols).
+    :returns:
+        array of resulting geometries as `shapely.geometry.box` objects.
+    """
+    # the transforms might be given with or without the last row
+    transforms = np.array(
+        [transform[:6] for transform in transforms], dtype=np.float64
+    ).reshape(-1, 6)
+    shapes = np.array(shapes, dtype=np.float64).reshape(-1, 2)
+    # origin and extent of the rasters in spatial reference system coordinates
+    minx = transforms[:, 2]
+    maxy = transforms[:, 5]
+    maxx = minx + transforms[:, 0] * shapes[:, 1]
+    miny = maxy + transforms[:, 4] * shapes[:, 0]
+    return shapely.box(minx, miny, maxx, maxy)
+
+
+def polygons_from_rings(
+        rings: list[list[list[float]]]
+) -> np.ndarray:
+    """
+    Construct `shapely` polygons from their exterior rings (e.g., the
+    coordinates of GeoJSON polygons) in a single vectorized call.
+
+    :param rings:
+        list of exterior rings as sequences of (x, y) coordinates.
+        The rings may differ in their number of coordinates.
+    :returns:
+        array of `shapely.geometry.Polygon` objects.
+    """
+    if len(rings) == 0:
+        return np.empty(0, dtype=object)
+    lengths = [len(ring) for ring in rings]
+    # read the coordinates into a flat buffer (avoids numpy inspecting the
+    # nested lists) and reshape it to (x, y[, z]) tuples
+    coords = np.fromiter(
+        chain.from_iterable(chain.from_iterable(rings)), dtype=np.float64
+    )
+    coords = coords.reshape(-1, coords.size // sum(lengths))
+    ring_idx = np.repeat(np.arange(len(rings)), lengths)
+    return shapely.polygons(shapely.linearrings(coords, indices=ring_idx))
+
+
+def geometry_from_ewkt(geometry_wkt: str) -> BaseGeometry:
+    """
+    Parses (extended) well-known text in geographic coordinates into a
+    `shapely` geometry.
+
+    :param geometry_wkt:
+        well-known text optionally preceded by a spatial reference
+        identifier (e.g., ``SRID=4326;POLYGON((...))``)
+    :returns:
+        `shapely` geometry
+    """
+    srid, _, geometry_wkt = geometry_wkt.rpartition(";")
+    if srid and srid.replace(" ", "").upper() != "SRID=4326":
+        raise ValueError(
+            f"Geometry must be in geographic coordinates (SRID=4326), got {srid}"
+        )
+    return wkt.loads(geometry_wkt)
+
+
 def prepare_gdf(
-        metadata_list: list[dict]
+        metadata_list: list[dict] | dict[str, list]
 ) -> gpd.GeoDataFrame:
     """
     Convert list of metadata dictionaries to a GeoDataFrame.
@@ -92,14 +170,15 @@ def prepare_gdf(
     ..versionadd:: 0.3.0
 
     :param metadata_list:
-        list of metadata entries as dictionaries.
+        list of metadata entries as dictionaries or dictionary
+        of metadata columns (lists of equal length).
     :returns:
         resulting GeoDataFrame sorted by sensing time.
     """
+    df = pd.DataFrame(metadata_list)
     # return an empty GeoDataFrame if there are no entries
-    if len(metadata_list) == 0:
+    if df.empty:
         return gpd.GeoDataFrame()
-    df = pd.DataFrame(metadata_list)
     df.sort_values(by="sensing_time", inplace=True)
     return gpd.GeoDataFrame(df, geometry="geom", crs=df.epsg.unique()[0])
 
@@ -22,6 +22,7 @@ from __future__ import annotations
 import numpy as np
 import rasterio as rio
 import geopandas as gpd
+import shapely
 
 from collections import namedtuple
 from rasterio import Affine
@@ -76,7 +77,7 @@ def _epsg_from_utm_zone(utmzone: UTMZone) -> int:
         epsg_str += "7"
     else:
         raise ValueError("Not a valid hemisphere (allowed: north or south)")
-    epsg_str += str(utmzone.zone)
+    epsg_str += str(utmzone.zone).zfill(2)
     return int(epsg_str)
 
 
@@ -93,6 +94,29 @@ def infer_utm_zone(shape: Polygon | MultiPolygon) -> int:
     return _epsg_from_utm_zone(utmzone)
 
 
+def infer_utm_zones(shapes: np.ndarray | list[Polygon | MultiPolygon]) -> np.ndarray:
+    """
+    Vectorized version of `infer_utm_zone`. Returns the EPSG codes of the
+    UTM zones a set of geometries with geographic coordinates lie in (i.e.,
+    their centroids)
+
+    :param shapes:
+        geometries in geographic coordinates (WGS84) for which to check
+        the corresponding UTM zones
+    :returns:
+        array of integer EPSG codes
+    """
+    centroids = shapely.centroid(np.asarray(shapes, dtype=object))
+    lon = shapely.get_x(centroids)
+    lat = shapely.get_y(centroids)
+
+    if np.any((lat > 84) | (lat < -80)):
+        raise Exception("UTM Zones only valid within [-80, 84] latitude")
+
+    zone = ((lon + 180) // 6 + 1).astype(np.int64)
+    return np.where(lat > 0, 32600, 32700) + zone
+
+
 def check_aoi_geoms(
     in_dataset: Union[Path, gpd.GeoDataFrame],
     full_bounding_box_only: bool,
@@ -2,7 +2,7 @@
 Utility functions for working with timestamps.
 """
 
-from datetime import datetime, date
+from datetime import date
 
 
 def datetime_to_date(
@@ -16,6 +16,4 @@ def datetime_to_date(
     :return:
         Date object (e.g., 2023-05-16).
     """
-    return datetime.strptime(
-        timestamp.split("T")[0], "%Y-%m-%d"
-    ).date()
+    return date.fromisoformat(timestamp[:10])
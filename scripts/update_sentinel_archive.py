@@ -36,27 +36,38 @@ from __future__ import annotations
 
 import pandas as pd
 import numpy as np
+import errno
+import multiprocessing
+import os
 import shutil
+import threading
 
+from concurrent.futures import (
+    as_completed, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+)
 from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from eodal.config import get_settings
 from eodal.downloader.sentinel1.creodias import query_creodias as s1_creodias_query
 from eodal.downloader.sentinel2.creodias import query_creodias as s2_creodias_query
-from eodal.downloader.utils.creodias import download_datasets
+from eodal.downloader.utils.creodias import download_datasets, query_creodias_split
 from eodal.downloader.utils import unzip_datasets
 from eodal.metadata.database.querying import get_region
 from eodal.metadata.sentinel1.database.ingestion import meta_df_to_database as \
     s1_meta_to_db
 from eodal.metadata.sentinel1.database.querying import find_raw_data_by_bbox as \
     s1_db_query
+from eodal.metadata.sentinel1.database.querying import get_existing_product_uris \
+    as s1_existing_product_uris
 from eodal.metadata.sentinel1.parsing import parse_s1_metadata
 from eodal.metadata.sentinel2.database.ingestion import meta_df_to_database as \
     s2_meta_to_db
 from eodal.metadata.sentinel2.database.querying import find_raw_data_by_bbox as \
     s2_db_query
+from eodal.metadata.sentinel2.database.querying import get_existing_product_uris \
+    as s2_existing_product_uris
 from eodal.metadata.sentinel2.parsing import parse_s2_scene_metadata
 from eodal.utils.constants import ProcessingLevels
 from eodal.utils.exceptions import DataNotFoundError
@@ -74,6 +85,26 @@ required_subdirectories = {
     'sentinel2': ['GRANULE']
 }
 
+# the database sessions are not thread-safe. Years synchronized in parallel
+# therefore query the database one after another
+_db_lock = threading.Lock()
+
+
+def _with_db_lock(func: Callable[..., Any], **kwargs) -> Any:
+    """calls a database function while holding the database lock"""
+    with _db_lock:
+        return func(**kwargs)
+
+
+metadata_parsers = {
+    'sentinel1': parse_s1_metadata,
+    'sentinel2': parse_s2_scene_metadata,
+}
+existing_product_uris = {
+    'sentinel1': s1_existing_product_uris,
+    'sentinel2': s2_existing_product_uris
+}
+
 # write a dict that returns for each month the number of days
 months = np.arange(1, 13)
 days_per_month = {
@@ -130,14 +161,15 @@ def pull_from_creodias(
     :param kwargs:
         optional key-word arguments to pass to
         `~eodal.downloader.sentinel1.creodias.query_creodias` such sensor_mode and
-        product_type
+        product_type. `max_workers` sets the number of parallel downloads.
     :return:
         dataframe with references to downloaded datasets
     """
 
     # query database to get the bounding box of the selected region
     try:
-        region_gdf = get_region(region)
+        with _db_lock:
+            region_gdf = get_region(region)
     except Exception as e:
         logger.error(f"Failed to query region: {e}")
         return
@@ -151,23 +183,30 @@ def pull_from_creodias(
         try:
             product_type = kwargs.get('product_type', 'GRD')
             sensor_mode = kwargs.get('sensor_mode', 'IW')
-            meta_db_df = s1_db_query(
-                date_start=date_start,
-                date_end=date_end,
-                product_type=product_type,
-                sensor_mode=sensor_mode,
-                bounding_box=bounding_box_ewkt,
-            )
-
-            # check for available datasets on CREODIAS
-            datasets = s1_creodias_query(
-                start_date=date_start,
-                end_date=date_end,
-                max_records=max_records,
-                bounding_box=bounding_box,
-                product_type=product_type,
-                sensor_mode=sensor_mode
-            )
+            # the local database and CREODIAS are queried concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                meta_db_future = executor.submit(
+                    _with_db_lock,
+                    s1_db_query,
+                    date_start=date_start,
+                    date_end=date_end,
+                    product_type=product_type,
+                    sensor_mode=sensor_mode,
+                    bounding_box=bounding_box_ewkt,
+                )
+                # check for available datasets on CREODIAS
+                datasets_future = executor.submit(
+                    query_creodias_split,
+                    s1_creodias_query,
+                    start_date=date_start,
+                    end_date=date_end,
+                    max_records=max_records,
+                    bounding_box=bounding_box,
+                    product_type=product_type,
+                    sensor_mode=sensor_mode
+                )
+                meta_db_df = meta_db_future.result()
+                datasets = datasets_future.result()
         except Exception as e:
             logger.error(f'Failed to update Sentinel1 archive: {e}')
             return pd.DataFrame([])
@@ -176,22 +215,29 @@ def pull_from_creodias(
         try:
             processing_level = kwargs.get('processing_level', ProcessingLevels.L2A)
             cloud_cover_threshold = kwargs.get('cloud_cover_threshold', 100)
-            meta_db_df = s2_db_query(
-                date_start=date_start,
-                date_end=date_end,
-                processing_level=processing_level,
-                bounding_box=bounding_box_ewkt,
-            )
-
-            # check for available datasets
-            datasets = s2_creodias_query(
-                start_date=date_start,
-                end_date=date_end,
-                max_records=max_records,
-                processing_level=processing_level,
-                bounding_box=bounding_box,
-                cloud_cover_threshold=cloud_cover_threshold,
-            )
+            # the local database and CREODIAS are queried concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                meta_db_future = executor.submit(
+                    _with_db_lock,
+                    s2_db_query,
+                    date_start=date_start,
+                    date_end=date_end,
+                    processing_level=processing_level,
+                    bounding_box=bounding_box_ewkt,
+                )
+                # check for available datasets
+                datasets_future = executor.submit(
+                    query_creodias_split,
+                    s2_creodias_query,
+                    start_date=date_start,
+                    end_date=date_end,
+                    max_records=max_records,
+                    processing_level=processing_level,
+                    bounding_box=bounding_box,
+                    cloud_cover_threshold=cloud_cover_threshold,
+                )
+                meta_db_df = meta_db_future.result()
+                datasets = datasets_future.result()
         except Exception as e:
             logger.error(f'Failed to update Sentinel2 archive: {e}')
             return pd.DataFrame([])
@@ -199,24 +245,23 @@ def pull_from_creodias(
     else:
         raise ValueError(f'Unknown sensor: {sensor}')
 
-    # get .SAFE datasets from CREODIAS
-    datasets["product_uri"] = datasets.properties.apply(
-        lambda x: Path(x["productIdentifier"]).name
-    )
+    # get .SAFE datasets from CREODIAS (the dataset names are the product URIs)
+    datasets["product_uri"] = datasets["dataset_name"]
 
     # compare with records from local metadata DB and keep those records
     # not available locally
-    missing_datasets = np.setdiff1d(
-        datasets["product_uri"].values,
-        meta_db_df["product_uri"].values
-    )
-    datasets_filtered = datasets[datasets.product_uri.isin(missing_datasets)].copy()
+    # isin builds the hash table of the local product URIs itself
+    available_locally = meta_db_df["product_uri"].to_numpy()
+    datasets_filtered = datasets.loc[
+        ~datasets["product_uri"].isin(available_locally)
+    ].copy()
 
     # download those mapper not available in the local database from CREODIAS
     download_datasets(
         datasets=datasets_filtered,
         download_dir=path_out,
         overwrite_existing_zips=overwrite_existing_zips,
+        max_workers=kwargs.get('max_workers'),
     )
 
     # unzip datasets
@@ -233,6 +278,229 @@ def pull_from_creodias(
     return datasets_filtered
 
 
+def _maybe_replace(series: pd.Series, old: str, new: str) -> pd.Series:
+    """
+    Replaces a sub-string in a series of paths. The series is returned
+    unchanged if there is nothing to replace.
+
+    :param series:
+        series of paths
+    :param old:
+        sub-string to replace (e.g., the mount point)
+    :param new:
+        replacement of the sub-string
+    :returns:
+        series with replaced sub-strings
+    """
+    if not old or old == new:
+        return series
+    return series.astype(str).str.replace(old, new, regex=False)
+
+
+def _scenes_to_database(
+    scenes_metadata: List[Dict[str, Any]],
+    scenes_in_dirs: List[Path],
+    sensor: str,
+    batch_size: int,
+    path_options: Optional[Dict[str, str]],
+) -> None:
+    """
+    Inserts the metadata of the downloaded scenes into the metadata DB in
+    batches. Scenes whose metadata could not be inserted are deleted.
+
+    :param scenes_metadata:
+        parsed metadata of the scenes
+    :param scenes_in_dirs:
+        directories of the scenes in the archive
+    :param sensor:
+        name of the sensor (`sentinel1` or `sentinel2`)
+    :param batch_size:
+        number of scenes inserted at once
+    :param path_options:
+        storage_device_ip, storage_device_ip_alias, mount_point and
+        mount_point_replacement to apply (if any)
+    """
+    if len(scenes_metadata) == 0:
+        return
+    meta_df = pd.DataFrame(scenes_metadata)
+
+    # some path handling if required (applied to all scenes at once)
+    if path_options:
+        storage_device_ip, storage_device_ip_alias, mount_point, \
+            mount_point_replacement = (
+                path_options.get(key, "") for key in (
+                    "storage_device_ip",
+                    "storage_device_ip_alias",
+                    "mount_point",
+                    "mount_point_replacement",
+                )
+            )
+        meta_df = meta_df.assign(
+            storage_device_ip=storage_device_ip,
+            storage_device_ip_alias=storage_device_ip_alias,
+            storage_share=_maybe_replace(
+                meta_df["storage_share"], mount_point, mount_point_replacement
+            ),
+        )
+
+    try:
+        if sensor == 'sentinel1':
+            failed = s1_meta_to_db(meta_df=meta_df, batch_size=batch_size)
+        elif sensor == 'sentinel2':
+            failed = s2_meta_to_db(meta_df=meta_df, batch_size=batch_size)
+    except Exception as e:
+        logger.error(f'Could not ingest scene metadata into DB: {e}')
+        failed = range(len(scenes_in_dirs))
+    failed = set(failed)
+    for idx, in_dir in enumerate(scenes_in_dirs):
+        if idx in failed:
+            logger.error(f'Could not ingest scene metadata for {in_dir.name} into DB')
+            shutil.rmtree(in_dir)
+        else:
+            logger.info(f"Ingested scene metadata for {in_dir.name} into DB")
+
+
+def _sync_year(
+    path: Path,
+    year: int,
+    region: str,
+    sensor: str,
+    parse_executor: Executor,
+    overwrite_existing_zips: bool,
+    **kwargs
+) -> Tuple[List[Dict[str, Any]], List[Path]]:
+    """
+    Downloads the datasets of a year missing in the archive from CREODIAS,
+    moves them into the archive and parses their metadata. The metadata is
+    not inserted into the database.
+
+    :param path:
+        directory of the year in the archive
+    :param year:
+        year to synchronize
+    :param region:
+        region identifier of the archive
+    :param sensor:
+        name of the sensor (`sentinel1` or `sentinel2`)
+    :param parse_executor:
+        executor the metadata of the scenes is parsed in
+    :param overwrite_existing_zips:
+        if False existing zip files are not downloaded again
+    :param kwargs:
+        optional key-word arguments to pass to `pull_from_creodias`
+    :returns:
+        parsed metadata of the new scenes and their directories
+    """
+    scenes_metadata, scenes_in_dirs = [], []
+
+    # create temporary download directory
+    path_out = path.joinpath(f"temp_dl_{year}")
+    path_out.mkdir(exist_ok=True)
+
+    # download data from CREODIAS for each month of the year
+    for month in months:
+
+        # check if the current month and year are in the future
+        if date(year, month, 1) > date.today():
+            logger.info(f'{month}/{year} is in the future - skipping')
+            continue
+
+        downloaded_ds = pull_from_creodias(
+            date_start=date(year, month, days_per_month[month]),
+            date_end=date(year, month, days_per_month[month]),
+            path_out=path_out,
+            region=region,
+            sensor=sensor,
+            overwrite_existing_zips=overwrite_existing_zips,
+            **kwargs
+        )
+
+        if downloaded_ds.empty:
+            logger.info(
+                f"No new datasets found for {month}/{year} on CREODIAS")
+            continue
+
+        # move the datasets into the actual SAT archive (one level up)
+        moved_in_dirs = []
+        for record in downloaded_ds.itertuples(index=False):
+            # check if the record exists first
+            if not path_out.joinpath(record.dataset_name).exists():
+                logger.warn(f'{record.dataset_name} does not exist')
+                continue
+
+            # never move a dataset into (or over) one already in the archive
+            in_dir = path.joinpath(record.dataset_name)
+            if in_dir.exists():
+                logger.error(
+                    f'{record.dataset_name} already exists in {path} - skipping')
+                continue
+
+            # the download directory is on the same file system as the archive
+            # so that the dataset can be renamed (no copying). shutil.move is
+            # only used as fallback if the archive is on another file system
+            try:
+                try:
+                    os.replace(path_out.joinpath(record.dataset_name), in_dir)
+                except OSError as e:
+                    if e.errno != errno.EXDEV or in_dir.exists():
+                        raise
+                    shutil.move(path_out.joinpath(record.dataset_name), in_dir)
+                logger.info(f"Moved {record.dataset_name} to {path}")
+            except Exception as e:
+                logger.error(f'Could not move {record.dataset_name}: {e}')
+                continue
+
+            # check if the SAFE folder is complete
+            missing_subdirs = [
+                x for x in required_subdirectories[sensor]
+                if not in_dir.joinpath(x).exists()
+            ]
+            if len(missing_subdirs) > 0:
+                logger.error(
+                    f'{record.dataset_name} has no '
+                    f'sub-directory {missing_subdirs[0]}')
+                shutil.rmtree(in_dir)
+                continue
+            moved_in_dirs.append(in_dir)
+
+        # datasets already in the metadata DB are not parsed again. They
+        # are looked up at once
+        with _db_lock:
+            existing = existing_product_uris[sensor](
+                [in_dir.name for in_dir in moved_in_dirs]
+            )
+        for product_uri in existing:
+            logger.info(f'{product_uri} is already in DB - skipping')
+        moved_in_dirs = [x for x in moved_in_dirs if x.name not in existing]
+
+        # once the datasets are moved successfully parse their metadata
+        # (in parallel)
+        futures = [
+            parse_executor.submit(metadata_parsers[sensor], in_dir)
+            for in_dir in moved_in_dirs
+        ]
+        for in_dir, future in zip(moved_in_dirs, futures):
+            try:
+                scene_metadata = future.result()
+            except Exception as e:
+                logger.error(f'Parsing of metadata of {in_dir.name} failed: {e}')
+                shutil.rmtree(in_dir)
+                continue
+            # the Sentinel-2 parser also returns the datastrip metadata
+            if sensor == 'sentinel2':
+                scene_metadata = scene_metadata[0]
+            scenes_metadata.append(scene_metadata)
+            scenes_in_dirs.append(in_dir)
+
+    # delete the temp_dl directory. It is empty unless some datasets could
+    # not be moved
+    try:
+        path_out.rmdir()
+    except OSError:
+        shutil.rmtree(path_out)
+    return scenes_metadata, scenes_in_dirs
+
+
 def sentinel_creodias_update(
     sentinel_raw_data_archive: Path,
     region: str,
@@ -293,6 +561,17 @@ def sentinel_creodias_update(
         process was interrupted (e.g., due to a connection timeout) setting the flag
         to True can save time because datasets already downloaded are ignored. NOTE:
         The function does **not** check if a dataset was downloaded completely!
+    :param batch_size:
+        number of scenes whose metadata is inserted into the metadata DB at
+        once (default: 2000).
+    :param max_workers:
+        maximum number of datasets downloaded from CREODIAS at once (default:
+        `CREODIAS_MAX_DOWNLOAD_WORKERS` in the BaseSettings). The downloads
+        are shared among the years synchronized in parallel (up to 4).
+    :param n_processes:
+        number of processes the metadata of the scenes is parsed in (default:
+        number of CPUs). The processes are spawned, i.e., scripts calling this
+        function must guard their entry point by ``if __name__ == '__main__'``.
 
     Example
     -------
@@ -333,126 +612,74 @@ def sentinel_creodias_update(
     )
 
     """
-    sensor = kwargs.get('sensor')
+    sensor = kwargs.pop('sensor', None)
+    batch_size = kwargs.pop('batch_size', 2000)
+    n_processes = kwargs.pop('n_processes', None)
     if sensor is None:
         raise TypeError('Sensor is required')
     if sensor not in ['sentinel1', 'sentinel2']:
         raise ValueError(f'Unknown sensor: {sensor}')
 
     # since the data is stored by year (each year is a single sub-directory) we
-    # can simple loop over the sub-directories and do the check
-    for path in Path(sentinel_raw_data_archive).iterdir():
-        if path.is_dir():
-            # get year automatically
-            try:
-                year = int(path.name)
-            except ValueError:
-                logger.info(f'{path.name} is not provided in YYYY format - skipping')
+    # can simple loop over the sub-directories and do the check. The years are
+    # independent of each other and synchronized in parallel (the DirEntry
+    # serves is_dir from the cached directory listing, symlinks are followed)
+    years = {}
+    with os.scandir(sentinel_raw_data_archive) as it:
+        for entry in it:
+            if not entry.is_dir():
                 continue
+            # get year automatically
+            if len(entry.name) == 4 and entry.name.isdecimal():
+                years[Path(entry.path)] = int(entry.name)
+            else:
+                logger.info(f'{entry.name} is not provided in YYYY format - skipping')
+    if len(years) == 0:
+        return
 
-            # create temporary download directory
-            path_out = path.joinpath(f"temp_dl_{year}")
-            path_out.mkdir(exist_ok=True)
-
-            # download data from CREODIAS for each month of the year
-            for month in months:
-
-                # check if the current month and year are in the future
-                if date(year, month, 1) > date.today():
-                    logger.info(f'{month}/{year} is in the future - skipping')
-                    continue
-
-                downloaded_ds = pull_from_creodias(
-                    date_start=date(year, month, days_per_month[month]),
-                    date_end=date(year, month, days_per_month[month]),
-                    path_out=path_out,
-                    region=region,
-                    overwrite_existing_zips=overwrite_existing_zips,
-                    **kwargs
+    # parsing the metadata xmls is CPU-bound, therefore, the scenes of all
+    # years are parsed in a single pool of processes. The pool is used by
+    # several threads, therefore, its processes are spawned instead of forked
+    # (forking a multi-threaded process may deadlock the child processes)
+    parse_executor = ProcessPoolExecutor(
+        max_workers=n_processes, mp_context=multiprocessing.get_context("spawn")
+    )
+    # the years share the download budget (`max_workers`, by default
+    # CREODIAS_MAX_DOWNLOAD_WORKERS) so that at most that many datasets are
+    # downloaded from CREODIAS at once in total
+    max_downloads = kwargs.pop('max_workers', None)
+    if max_downloads is None:
+        max_downloads = settings.CREODIAS_MAX_DOWNLOAD_WORKERS
+    max_downloads = max(1, max_downloads)
+    n_year_threads = min(len(years), 4, max_downloads)
+    kwargs['max_workers'] = max_downloads // n_year_threads
+
+    with parse_executor, ThreadPoolExecutor(
+        max_workers=n_year_threads
+    ) as executor:
+        futures = [
+            executor.submit(
+                _sync_year,
+                path=path,
+                year=year,
+                region=region,
+                sensor=sensor,
+                parse_executor=parse_executor,
+                overwrite_existing_zips=overwrite_existing_zips,
+                **kwargs
+            )
+            for path, year in years.items()
+        ]
+        # the scenes of a year are inserted into the database (in the main
+        # thread) as soon as the year is synchronized so that the archive
+        # and the database stay consistent if the run is interrupted
+        for future in as_completed(futures):
+            scenes_metadata, scenes_in_dirs = future.result()
+            with _db_lock:
+                _scenes_to_database(
+                    scenes_metadata=scenes_metadata,
+                    scenes_in_dirs=scenes_in_dirs,
+                    sensor=sensor,
+                    batch_size=batch_size,
+                    path_options=path_options,
                 )
-
-                if downloaded_ds.empty:
-                    logger.info(
-                        f"No new datasets found for {month}/{year} on CREODIAS")
-                    continue
-
-                # move the datasets into the actual SAT archive (on level up)
-                parent_dir = path_out.parent
-                for _, record in downloaded_ds.iterrows():
-                    # check if the record exists first
-                    if not path_out.joinpath(record.dataset_name).exists():
-                        logger.warn(f'{record.dataset_name} does not exist')
-                        continue
-
-                    try:
-                        shutil.move(record.dataset_name, "..")
-                        logger.info(f"Moved {record.dataset_name} to {parent_dir}")
-                    except Exception as e:
-                        logger.error(f'Could not move {record.dataset_name}: {e}')
-                        continue
-
-                    # check if the SAFE folder is complete
-                    for required_subdir in required_subdirectories[sensor]:
-                        if not parent_dir.joinpath(record.dataset_name).joinpath(
-                                required_subdir).exists():
-                            logger.error(
-                                f'{record.dataset_name} has no '
-                                f'sub-directory {required_subdir}')
-                            shutil.rmtree(parent_dir.joinpath(record.dataset_name))
-                            continue
-
-                    # once the dataset is moved successfully parse its metadata and
-                    # ingest it into the database
-                    in_dir = path.joinpath(record.dataset_name)
-                    try:
-                        if sensor == 'sentinel1':
-                            scene_metadata = parse_s1_metadata(in_dir=in_dir)
-                        elif sensor == 'sentinel2':
-                            scene_metadata, _ = parse_s2_scene_metadata(in_dir=in_dir)
-                    except Exception as e:
-                        logger.error(
-                            f'Parsing of metadata of {record.dataset_name} '
-                            f'failed: {e}')
-                        shutil.rmtree(in_dir)
-                        continue
-
-                    # some path handling if required
-                    if path_options != {}:
-                        try:
-                            scene_metadata["storage_device_ip"] = \
-                                path_options.get("storage_device_ip", "")
-                            scene_metadata["storage_device_ip_alias"] = \
-                                path_options.get("storage_device_ip_alias", "")
-                            mount_point = path_options.get("mount_point", "")
-                            mount_point_replacement = \
-                                path_options.get("mount_point_replacement", "")
-                            scene_metadata["storage_share"] = scene_metadata[
-                                "storage_share"
-                            ].replace(mount_point, mount_point_replacement)
-                        except Exception as e:
-                            logger.error(
-                                f'Handling path options for {record.dataset_name} '
-                                f'failed: {e}')
-                            shutil.rmtree(in_dir)
-                            continue
-
-                    # database insert
-                    try:
-                        scene_metadata = pd.DataFrame([scene_metadata])
-                        if sensor == 'sentinel1':
-                            s1_meta_to_db(meta_df=scene_metadata)
-                        elif sensor == 'sentinel2':
-                            s2_meta_to_db(meta_df=scene_metadata)
-                        logger.info(
-                            f"Ingested scene metadata for {record.dataset_name} into DB"
-                        )
-                    except Exception as e:
-                        logger.error(
-                            'Could not ingest scene metadata for '
-                            f'{record.dataset_name} into DB: {e}'
-                        )
-                        shutil.rmtree(in_dir)
-                        continue
-
-                # delete the temp_dl directory
-                shutil.rmtree(path_out)
@@ -63,3 +63,23 @@ def test_feature():
     assert feature_utm.epsg == 32632, 'projection had no effect'
     assert feature_utm.name == feature.name, 'name got lost'
     assert feature_utm.attributes == feature.attributes, 'attributes got lost'
+
+
+def test_feature_to_geoseries_does_not_leak():
+    """modifying the returned GeoSeries must not change the Feature"""
+    geom = Point([49, 11])
+    feature = Feature('Test Point', geom, 4326, {'key': 'value'})
+
+    gds = feature.to_geoseries()
+    gds.iloc[0] = Point([0, 0])
+    gds.attrs['key'] = 'other value'
+    gds.set_crs(epsg=32632, allow_override=True, inplace=True)
+
+    assert feature.geometry == geom, 'geometry was changed'
+    assert feature.attributes == {'key': 'value'}, 'attributes were changed'
+    assert feature.epsg == 4326, 'EPSG code was changed'
+
+    gds = feature.to_geoseries()
+    assert gds.iloc[0] == geom, 'geometry was changed'
+    assert gds.attrs == {'key': 'value'}, 'attributes were changed'
+    assert gds.crs.to_epsg() == 4326, 'EPSG code was changed'
@@ -19,10 +19,12 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 '''
 
+import numpy as np
 import pytest
 
 from eodal.mapper.filter import Filter
 
+
 def test_filter():
     # filter by cloud cover
     cc_filter = Filter(entity='cloudy_pixel_percentage', operator='<', value=30)
@@ -40,3 +42,29 @@ def test_filter():
     # passing None
     with pytest.raises(ValueError):
         cc_filter = Filter(entity='cloudy_pixel_percentage', operator='<', value=None)
+
+
+def test_filter_evaluate():
+    cc_filter = Filter(entity='cloudy_pixel_percentage', operator='<', value=30)
+    assert cc_filter.evaluate(10.)
+    assert not cc_filter.evaluate(30)
+
+    # string values are compared as strings
+    platform_filter = Filter(entity='spacecraft_name', operator='==', value='S2A')
+    assert platform_filter.evaluate('S2A')
+    assert not platform_filter.evaluate('S2B')
+
+    # list-like metadata entries are checked for membership
+    pol_filter = Filter(entity='sar:polarizations', operator='==', value='VV')
+    assert pol_filter.evaluate(['VV', 'VH'])
+    pol_filter = Filter(entity='sar:polarizations', operator='!=', value=['VV', 'HH'])
+    assert pol_filter.evaluate(['VV', 'VH'])
+
+    # string values are parsed when compared against non-string metadata
+    epsg_filter = Filter(entity='epsg', operator='==', value='32632')
+    assert epsg_filter.evaluate(32632)
+    assert not epsg_filter.evaluate(32633)
+    cc_filter = Filter(entity='cloudy_pixel_percentage', operator='<', value='20')
+    assert cc_filter.evaluate(10.)
+    assert not cc_filter.evaluate(25.)
+    assert cc_filter.evaluate(np.array([10., 25.])).tolist() == [True, False]
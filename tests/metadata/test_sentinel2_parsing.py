@@ -0,0 +1,39 @@
+'''
+Tests for caching the parsed Sentinel-2 metadata xmls
+'''
+
+from datetime import date
+
+from eodal.metadata.sentinel2 import parsing
+
+
+def test_parse_cached(tmp_path):
+    """parser outputs are cached as JSON and re-used"""
+    mtd_file = tmp_path.joinpath('MTD_TL.xml')
+    mtd_file.write_text('<xml/>')
+    cache_dir = tmp_path.joinpath('cache')
+
+    calls = []
+
+    def parse_MTD_TL(in_file):
+        calls.append(in_file)
+        return {'SENSING_DATE': date(2022, 7, 28), 'EPSG': 32632, 'ULX': 4.5}
+
+    first = parsing._parse_cached(parse_MTD_TL, mtd_file, cache_dir=cache_dir)
+    second = parsing._parse_cached(parse_MTD_TL, mtd_file, cache_dir=cache_dir)
+    assert first == second
+    assert isinstance(second['SENSING_DATE'], date)
+    assert len(calls) == 1, 'cached parser output was not re-used'
+    assert [x.suffix for x in cache_dir.iterdir()] == ['.json']
+
+    # entries written by another version of the parsers are not re-used
+    parsing._MTD_CACHE_VERSION += 1
+    try:
+        parsing._parse_cached(parse_MTD_TL, mtd_file, cache_dir=cache_dir)
+    finally:
+        parsing._MTD_CACHE_VERSION -= 1
+    assert len(calls) == 2, 'cache entries must depend on the parser version'
+
+    # entries are pruned once they are too old
+    parsing._prune_mtd_cache(cache_dir, max_age=-1)
+    assert list(cache_dir.iterdir()) == []
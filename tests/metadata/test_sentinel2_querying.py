@@ -0,0 +1,104 @@
+'''
+Tests for querying Sentinel-2 metadata from the metadata DB
+'''
+
+import pandas as pd
+import pytest
+
+from datetime import date
+from shapely import wkb
+from shapely.geometry import MultiPolygon, Point, box
+from sqlalchemy.dialects import postgresql
+
+from eodal.metadata.sentinel2.database import querying
+from eodal.utils.constants import ProcessingLevels
+
+
+def test_summarize_raw_data_by_tile(monkeypatch):
+    """the summary is computed by the database and returned as is"""
+    statements = []
+    summary = pd.DataFrame({'n_scenes': [3], 'cloudy_pixel_percentage': [12.5]})
+
+    def read_sql(statement, con, **kwargs):
+        statements.append(statement)
+        return summary
+
+    monkeypatch.setattr(querying.pd, 'read_sql', read_sql)
+
+    res = querying.summarize_raw_data_by_tile(
+        date_start=date(2022, 3, 1),
+        date_end=date(2022, 3, 31),
+        processing_level=ProcessingLevels.L2A,
+        tile='T32TLT',
+        cloud_cover_threshold=50,
+    )
+    assert res is summary
+
+    assert len(statements) == 1
+    compiled = statements[0].compile(
+        dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}
+    )
+    sql = str(compiled).lower()
+    assert 'count(*)' in sql
+    assert 'sentinel2_raw_metadata.cloudy_pixel_percentage) as cloudy_pixel' in sql
+    assert 'avg(' in sql
+    assert "tile_id = 't32tlt'" in sql
+    assert "sensing_date >= '2022-03-01'" in sql
+    assert "sensing_date <= '2022-03-31'" in sql
+    assert 'cloudy_pixel_percentage <= 50' in sql
+
+
+def test_find_raw_data_by_bbox(monkeypatch):
+    """bounding boxes are sent to the database as well-known binary"""
+    params = []
+
+    def read_sql(statement, con, **kwargs):
+        params.append(kwargs['params'])
+        return pd.DataFrame({'sensing_date': [date(2022, 3, 2)]})
+
+    monkeypatch.setattr(querying.pd, 'read_sql', read_sql)
+    kwargs = {
+        'date_start': date(2022, 3, 1),
+        'date_end': date(2022, 3, 31),
+        'processing_level': ProcessingLevels.L2A,
+    }
+
+    # geometries other than polygons (and (extended) well-known text)
+    multi_poly = MultiPolygon([box(8, 47, 8.1, 47.1), box(9, 47, 9.1, 47.1)])
+    for bounding_box in (multi_poly, multi_poly.wkt, f'SRID=4326;{multi_poly.wkt}'):
+        querying.find_raw_data_by_bbox(bounding_box=bounding_box, **kwargs)
+        assert wkb.loads(params[-1]['wkb']).equals(multi_poly)
+
+    # bounding boxes in other spatial reference systems are rejected
+    with pytest.raises(ValueError):
+        querying.find_raw_data_by_bbox(
+            bounding_box=f'SRID=2056;{box(2.6e6, 1.2e6, 2.7e6, 1.3e6).wkt}',
+            **kwargs
+        )
+
+
+def test_find_raw_data_by_bbox_degenerate(monkeypatch):
+    """degenerate bounding boxes do not query the database"""
+    statements = []
+
+    def read_sql(statement, con, **kwargs):
+        statements.append(statement)
+        return pd.DataFrame({'sensing_date': [date(2022, 3, 2)]})
+
+    monkeypatch.setattr(querying.pd, 'read_sql', read_sql)
+    kwargs = {
+        'date_start': date(2022, 3, 1),
+        'date_end': date(2022, 3, 31),
+        'processing_level': ProcessingLevels.L2A,
+    }
+
+    flat = MultiPolygon([box(8, 47, 8, 47.1), box(9, 47, 9, 47.1)])
+    for bounding_box in (flat, MultiPolygon(), 'MULTIPOLYGON EMPTY'):
+        res = querying.find_raw_data_by_bbox(bounding_box=bounding_box, **kwargs)
+        assert res.empty
+    assert statements == []
+
+    # points have no area but can intersect scenes
+    res = querying.find_raw_data_by_bbox(bounding_box=Point(8, 47), **kwargs)
+    assert not res.empty
+    assert len(statements) == 1
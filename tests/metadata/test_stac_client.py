@@ -2,14 +2,15 @@
 Tests for the pystac client interface
 '''
 
+import copy
 import pytest
 import geopandas as gpd
 
-from datetime import datetime
+from datetime import date, datetime
 from shapely.geometry import box
 
 from eodal.mapper.filter import Filter
-from eodal.metadata.stac import sentinel1, sentinel2
+from eodal.metadata.stac import client, landsat, sentinel1, sentinel2
 from eodal.utils.sentinel1 import _url_to_safe_name
 from eodal.utils.sentinel2 import ProcessingLevels
 
@@ -85,3 +86,114 @@ def test_mspc_sentinel2(get_polygons):
         
     assert not res_s2.empty, 'no results found'
     assert 'assets' in res_s2.columns, 'no assets provided'
+
+
+def _s2_item(day: int, cloud_cover: float) -> dict:
+    """minimal Sentinel-2 STAC item as returned by MSPC"""
+    return {
+        'id': f'S2A_MSIL2A_202201{day:02d}',
+        'geometry': {
+            'type': 'Polygon',
+            'coordinates': [[[8, 47], [8.1, 47], [8.1, 47.1], [8, 47]]]
+        },
+        'assets': {'B02': {'href': f'https://example.com/{day}/B02.tif'}},
+        'properties': {
+            's2:granule_id': f'granule_{day}',
+            'platform': 'Sentinel-2A',
+            's2:mgrs_tile': '32TMT',
+            'datetime': f'2022-01-{day:02d}T10:00:31.024000Z',
+            'eo:cloud_cover': cloud_cover,
+            'proj:epsg': 32632,
+            's2:mean_solar_azimuth': 160.,
+            's2:mean_solar_zenith': 65.,
+        }
+    }
+
+
+def test_sentinel2_filter_by_sensing_time(monkeypatch):
+    """filters on the sensing date and time see the parsed values"""
+    items = [_s2_item(day, 5.) for day in (1, 2, 3)]
+    monkeypatch.setattr(client, 'iter_stac', lambda **kwargs: iter(items))
+    kwargs = {
+        'bounding_box': box(8, 47, 8.1, 47.1),
+        'time_start': datetime(2022, 1, 1),
+        'time_end': datetime(2022, 1, 3),
+    }
+
+    res = sentinel2(
+        metadata_filters=[Filter('sensing_date', '>=', date(2022, 1, 2))], **kwargs)
+    assert res.sensing_date.tolist() == [date(2022, 1, 2), date(2022, 1, 3)]
+
+    res = sentinel2(
+        metadata_filters=[Filter('sensing_time', '<', datetime(2022, 1, 2))],
+        **kwargs)
+    assert res.sensing_date.tolist() == [date(2022, 1, 1)]
+
+
+def test_sentinel1_filter_by_derived_metadata(monkeypatch):
+    """EPSG codes and sensing dates are derived before filtering"""
+    items = [
+        {
+            'id': f'S1A_IW_GRDH_{day}',
+            'bbox': [lon, 47., lon + 0.5, 47.5],
+            'assets': {'vh': {'href': f'https://example.com/{day}/vh.tif'}},
+            'properties': {
+                'datetime': f'2022-01-{day:02d}T05:30:00.000000Z',
+                'sar:instrument_mode': 'IW',
+            }
+        }
+        for day, lon in ((1, 8.), (2, 8.), (3, 14.))
+    ]
+    monkeypatch.setattr(
+        client, 'iter_stac', lambda **kwargs: iter(copy.deepcopy(items)))
+    kwargs = {
+        'bounding_box': box(8, 47, 8.1, 47.1),
+        'time_start': datetime(2022, 1, 1),
+        'time_end': datetime(2022, 1, 3),
+    }
+
+    res = sentinel1(metadata_filters=[Filter('epsg', '==', 32632)], **kwargs)
+    assert res.sensing_date.tolist() == [date(2022, 1, 1), date(2022, 1, 2)]
+
+    res = sentinel1(
+        metadata_filters=[Filter('sensing_date', '>', date(2022, 1, 1))], **kwargs)
+    assert res.epsg.tolist() == [32632, 32633]
+
+
+def test_landsat_filter_by_sensing_date(monkeypatch):
+    """sensing dates are derived before filtering"""
+    items = [
+        {
+            'id': f'LC09_L2SP_194027_202201{day:02d}',
+            'assets': {
+                'red': {
+                    'href': f'https://example.com/{day}/red.tif',
+                    'type': 'image/tiff; application=geotiff',
+                    'roles': ['data'],
+                }
+            },
+            'properties': {
+                'datetime': f'2022-01-{day:02d}T10:15:00.000000Z',
+                'proj:epsg': 32632,
+                'proj:transform': [30., 0., 400000., 0., -30., 5300000.],
+                'proj:shape': [100, 100],
+                'view:sun_azimuth': 160.,
+                'view:sun_elevation': 25.,
+                'view:off_nadir': 0.,
+            }
+        }
+        for day in (1, 2, 3)
+    ]
+    monkeypatch.setattr(client, 'iter_stac', lambda **kwargs: iter(items))
+
+    res = landsat(
+        metadata_filters=[Filter('sensing_date', '<=', date(2022, 1, 2))],
+        collection='landsat-c2-l2',
+        bounding_box=box(8, 47, 8.1, 47.1),
+        time_start=datetime(2022, 1, 1),
+        time_end=datetime(2022, 1, 3),
+    )
+    assert res.sensing_date.tolist() == [date(2022, 1, 1), date(2022, 1, 2)]
+    assert (res.sun_zenith_angle == 65.).all()
+    # the asset metadata is kept for Landsat
+    assert res.assets.iloc[0]['red']['roles'] == ['data']